@@ -1,123 +1,278 @@
-import requests
-from PIL import Image
-from io import BytesIO
-import pandas as pd
-import time
-
-class JeecgCrawler:
-    def __init__(self):
-        self.session = requests.Session()
-        self.base_url = "https://boot3.jeecg.com/jeecgboot"
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
-            "Referer": "https://boot3.jeecg.com/login"
-        }
-
-    # ...existing code...
-    def get_captcha(self):
-        """获取验证码图片和checkKey"""
-        import time, random, string
-        self.session.get("https://boot3.jeecg.com/login", headers=self.headers)
-        t = str(int(time.time() * 1000))
-        rand_str = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
-        check_key = t + rand_str
-        captcha_url = f"{self.base_url}/sys/randomImage/{check_key}?_t={t}"
-        response = self.session.get(captcha_url, headers=self.headers)
-        try:
-            data = response.json()
-            base64_img = data.get("result", "")
-            if base64_img.startswith("data:image"):
-                import base64
-                from PIL import Image
-                from io import BytesIO
-                img_str = base64_img.split(",")[1]
-                img_data = base64.b64decode(img_str)
-                img = Image.open(BytesIO(img_data))
-                img.show()
-                print("验证码已弹出，请输入验证码")
-                return check_key
-            else:
-                print("未获取到有效的验证码图片数据")
-                return None
-        except Exception as e:
-            print(f"验证码获取异常: {str(e)}")
-            print("返回内容：", response.text[:200])
-            return None
-
-    def login(self, username, password, captcha, check_key):
-        login_url = f"{self.base_url}/sys/login"
-        login_data = {
-            "username": username,
-            "password": password,
-            "captcha": captcha,
-            "checkKey": check_key
-        }
-        response = self.session.post(login_url, headers=self.headers, json=login_data)
-        result = response.json()
-        if result.get("success"):
-            print("登录成功！")
-            token = result.get("result", {}).get("token")
-            if token:
-                self.headers["X-Access-Token"] = token
-            return True
-        else:
-            print(f"登录失败: {result.get('message')}")
-            return False
-
-    def get_my_tasks(self):
-        """获取所有任务办理中我的任务数据"""
-        import pandas as pd
-        all_records = []
-        page_no = 1
-        page_size = 10
-
-        while True:
-            params = {
-                "column": "createTime",
-                "order": "desc",
-                "pageNo": page_no,
-                "pageSize": page_size,
-                "_t": int(time.time() * 1000)
-            }
-            tasks_url = f"{self.base_url}/act/task/list"
-            response = self.session.get(tasks_url, headers=self.headers, params=params)
-            try:
-                data = response.json()
-            except Exception:
-                print("任务接口返回异常：", response.text[:200])
-                break
-            if data.get("success"):
-                records = data.get("result", {}).get("records", [])
-                if not records:
-                    break
-                all_records.extend(records)
-                print(f"已获取第{page_no}页，共{len(records)}条")
-                # 如果本页数量小于page_size，说明已经是最后一页
-                if len(records) < page_size:
-                    break
-                page_no += 1
-            else:
-                print("任务接口返回失败：", data.get("message"))
-                break
-
-        if all_records:
-            df = pd.DataFrame(all_records)
-            df.to_excel("jeecg_my_tasks.xlsx", index=False)
-            print(f"所有任务数据已保存到 jeecg_my_tasks.xlsx，共{len(all_records)}条")
-        else:
-            print("没有获取到任务数据")
-
-def main():
-    crawler = JeecgCrawler()
-    check_key = crawler.get_captcha()
-    if check_key:
-        captcha = input("请输入验证码: ")
-        if crawler.login("jeecg", "jeecg#123456", captcha, check_key):
-            crawler.get_my_tasks()
-        else:
-            print("登录失败，程序退出")
-    else:
-        print("获取验证码失败，程序退出")
-
-if __name__ == "__main__":
+import requests
+from PIL import Image
+from io import BytesIO
+import time
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from jsonl_export import iter_jsonl, jsonl_to_xlsx
+
+
+class TaskSink:
+    """按页码顺序把任务追加写入 JSONL 文件，并记录已写完的页码，中断后可以从下一页继续"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state_file = path + ".state.json"
+        self.page_size = None
+        self.pages_done = 0
+        self.count = 0
+        self.seen_ids = set()
+        self.file = None
+
+        state = None
+        if os.path.exists(self.state_file) and os.path.exists(self.path):
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"续传状态无法读取，重新开始: {e}")
+        if state:
+            self.page_size = state["page_size"]
+            self.pages_done = state["pages_done"]
+            # 截掉上次中断时写了一半的页面
+            with open(self.path, "r+b") as f:
+                f.truncate(state["offset"])
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record_id = json.loads(line).get("id")
+                    if record_id is not None:
+                        self.seen_ids.add(record_id)
+                    self.count += 1
+
+    def open(self, page_size):
+        """开始写入；没有续传状态时清空旧文件"""
+        if self.page_size != page_size:
+            self.page_size = page_size
+            self.pages_done = 0
+            self.count = 0
+            self.seen_ids.clear()
+            open(self.path, "wb").close()
+        self.file = open(self.path, "ab")
+
+    def write_page(self, page_no, records):
+        """写入一页任务并保存续传状态，返回新增条数"""
+        added = 0
+        for record in records:
+            # 抓取过程中有新任务插入时，后面的页面会出现重复记录，按 id 去重
+            record_id = record.get("id")
+            if record_id is not None:
+                if record_id in self.seen_ids:
+                    continue
+                self.seen_ids.add(record_id)
+            self.file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            added += 1
+        self.file.flush()
+        self.count += added
+        self.pages_done = page_no
+        self.save_state()
+        return added
+
+    def save_state(self):
+        state = {"page_size": self.page_size, "pages_done": self.pages_done, "offset": self.file.tell()}
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def finish(self):
+        """全部页面写完后删除续传状态"""
+        self.close()
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
+
+    def iter_records(self):
+        return iter_jsonl(self.path)
+
+    def to_xlsx(self, xlsx_path):
+        """逐行把 JSONL 转成 Excel"""
+        jsonl_to_xlsx(self.path, xlsx_path)
+
+
+class JeecgCrawler:
+    def __init__(self, max_workers=4):
+        self.session = requests.Session()
+        self.base_url = "https://boot3.jeecg.com/jeecgboot"
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
+            "Referer": "https://boot3.jeecg.com/login"
+        }
+        # 知道总页数后，其余页面并发获取
+        self.max_workers = max(1, int(max_workers))
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # 从大到小尝试的每页条数，使用服务器接受的最大值
+        self.page_size_candidates = (1000, 500, 200, 100, 50, 10)
+
+    # ...existing code...
+    def get_captcha(self):
+        """获取验证码图片和checkKey"""
+        import time, random, string
+        self.session.get("https://boot3.jeecg.com/login", headers=self.headers)
+        t = str(int(time.time() * 1000))
+        rand_str = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
+        check_key = t + rand_str
+        captcha_url = f"{self.base_url}/sys/randomImage/{check_key}?_t={t}"
+        response = self.session.get(captcha_url, headers=self.headers)
+        try:
+            data = response.json()
+            base64_img = data.get("result", "")
+            if base64_img.startswith("data:image"):
+                import base64
+                from PIL import Image
+                from io import BytesIO
+                img_str = base64_img.split(",")[1]
+                img_data = base64.b64decode(img_str)
+                img = Image.open(BytesIO(img_data))
+                img.show()
+                print("验证码已弹出，请输入验证码")
+                return check_key
+            else:
+                print("未获取到有效的验证码图片数据")
+                return None
+        except Exception as e:
+            print(f"验证码获取异常: {str(e)}")
+            print("返回内容：", response.text[:200])
+            return None
+
+    def login(self, username, password, captcha, check_key):
+        login_url = f"{self.base_url}/sys/login"
+        login_data = {
+            "username": username,
+            "password": password,
+            "captcha": captcha,
+            "checkKey": check_key
+        }
+        response = self.session.post(login_url, headers=self.headers, json=login_data)
+        result = response.json()
+        if result.get("success"):
+            print("登录成功！")
+            token = result.get("result", {}).get("token")
+            if token:
+                self.headers["X-Access-Token"] = token
+            return True
+        else:
+            print(f"登录失败: {result.get('message')}")
+            return False
+
+    def fetch_task_page(self, page_no, page_size):
+        """获取一页任务，返回接口的 result（含 records/total/pages/size），失败返回 None"""
+        params = {
+            "column": "createTime",
+            "order": "desc",
+            "pageNo": page_no,
+            "pageSize": page_size,
+            "_t": int(time.time() * 1000)
+        }
+        tasks_url = f"{self.base_url}/act/task/list"
+        try:
+            response = self.session.get(tasks_url, headers=self.headers, params=params, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+        except ValueError:
+            # requests 的 JSONDecodeError 同时继承 ValueError 和 RequestException，要先捕获
+            print("任务接口返回异常：", response.text[:200])
+            return None
+        except requests.RequestException as e:
+            print(f"第{page_no}页请求失败：{e}")
+            return None
+        if not data.get("success"):
+            print("任务接口返回失败：", data.get("message"))
+            return None
+        return data.get("result") or {}
+
+    def probe_page_size(self):
+        """从大到小尝试每页条数，返回 (实际每页条数, 第1页结果)"""
+        for page_size in self.page_size_candidates:
+            result = self.fetch_task_page(1, page_size)
+            if result is None:
+                continue
+            # 服务器可能把过大的 pageSize 截断到上限，以返回的 size 和实际条数为准
+            size = min(int(result.get("size") or page_size), page_size)
+            records = result.get("records", [])
+            if len(records) < size and int(result.get("total") or 0) > len(records):
+                size = len(records)
+            if size > 0:
+                return size, result
+            return page_size, result
+        return None, None
+
+    def get_my_tasks(self, jsonl_file="jeecg_my_tasks.jsonl", xlsx_file="jeecg_my_tasks.xlsx"):
+        """获取所有任务办理中我的任务数据，每页到达后立即写入 JSONL，中断后再次运行从下一页继续"""
+        sink = TaskSink(jsonl_file)
+        if sink.page_size:
+            # 续传时沿用上次的每页条数，页码才能对得上
+            page_size = sink.page_size
+            first = self.fetch_task_page(1, page_size)
+            print(f"从第{sink.pages_done + 1}页继续，已保存{sink.count}条")
+        else:
+            page_size, first = self.probe_page_size()
+        if first is None:
+            print("没有获取到任务数据")
+            return
+
+        total = int(first.get("total") or 0)
+        pages = -(-total // page_size) if total else 1
+        print(f"共{total}条任务，每页{page_size}条，共{pages}页")
+
+        sink.open(page_size)
+        complete = True
+        try:
+            page_nos = list(range(max(sink.pages_done + 1, 2), pages + 1))
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # map 按页码顺序返回结果，页面按顺序写入，续传状态只需记录最后一页
+                results = executor.map(lambda n: self.fetch_task_page(n, page_size), page_nos)
+                if sink.pages_done == 0:
+                    added = sink.write_page(1, first.get("records", []))
+                    print(f"已获取第1页，共{len(first.get('records', []))}条，新增{added}条")
+                for page_no, result in zip(page_nos, results):
+                    if result is None:
+                        # 失败的页面立即重试一次，仍失败则停止，下次从这一页继续
+                        result = self.fetch_task_page(page_no, page_size)
+                    if result is None:
+                        print(f"第{page_no}页获取失败，下次运行将从这一页继续")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        complete = False
+                        break
+                    records = result.get("records", [])
+                    added = sink.write_page(page_no, records)
+                    print(f"已获取第{page_no}页，共{len(records)}条，新增{added}条")
+        finally:
+            sink.close()
+
+        if not complete:
+            print(f"已保存{sink.count}条任务到 {jsonl_file}")
+            return
+
+        if total and sink.count < total:
+            print(f"注意：接口报告{total}条，实际获取{sink.count}条（抓取期间任务列表可能有变化）")
+
+        if sink.count:
+            sink.to_xlsx(xlsx_file)
+            print(f"所有任务数据已保存到 {xlsx_file}，共{sink.count}条")
+        else:
+            print("没有获取到任务数据")
+        sink.finish()
+
+def main():
+    crawler = JeecgCrawler()
+    check_key = crawler.get_captcha()
+    if check_key:
+        captcha = input("请输入验证码: ")
+        if crawler.login("jeecg", "jeecg#123456", captcha, check_key):
+            crawler.get_my_tasks()
+        else:
+            print("登录失败，程序退出")
+    else:
+        print("获取验证码失败，程序退出")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
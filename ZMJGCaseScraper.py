@@ -1,15 +1,1362 @@
+import sys
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
 import json
 import csv
 import time
 import os
 import re
-from urllib.parse import urljoin
+import random
+import zlib
+import hashlib
+import codecs
+import contextlib
+import sqlite3
+import asyncio
+import queue
+import socket
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qs, urlencode
+
+
+# 案件详情页的各个部分
+CASE_SECTIONS = ('案件信息', '涉案人信息', '涉案物品', '运输信息', '承办信息',
+                 '举报记录表', '涉案物品核价表', '物品确认', '结案报告表')
+
+
+# 会话过期时服务器返回的登录表单：包含 <form> 和密码输入框。两者分别查找，
+# 写成一个 <form\b[\s\S]*<input... 的正则在表单很多的页面上会反复回溯
+FORM_TAG_PATTERN = re.compile(r'<form\b', re.I)
+PASSWORD_INPUT_PATTERN = re.compile(r'<input\b[^>]*type\s*=\s*["\']?password', re.I)
+
+
+def is_login_form(html):
+    """页面是否包含登录表单"""
+    return bool(PASSWORD_INPUT_PATTERN.search(html)) and bool(FORM_TAG_PATTERN.search(html))
+
+# 可选的HTML解析后端：html.parser 和 lxml 构建 BeautifulSoup，selectolax 使用 lexbor 引擎
+PARSER_BACKENDS = ('html.parser', 'lxml', 'selectolax')
+
+# Python 3.12 起 cProfile 基于进程范围的 sys.monitoring：一个分析器就能分析所有线程，
+# 但同一时间只能启用一个；之前的版本每个分析器只分析启用它的线程
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+
+def parse_html(html, parser='html.parser'):
+    """按指定后端解析HTML"""
+    if parser == 'selectolax':
+        from selectolax.lexbor import LexborHTMLParser
+        tree = LexborHTMLParser(html)
+        # 脚本和样式不是页面文本，text() 却会带上它们的内容，解析后直接去掉
+        tree.strip_tags(['script', 'style', 'template'])
+        return tree
+    return BeautifulSoup(html, parser)
+
+
+def release_html(doc):
+    """用完后释放解析树：BeautifulSoup 的节点互相引用，不 decompose() 要等垃圾回收才释放"""
+    if isinstance(doc, Tag):
+        doc.decompose()
+
+
+# BeautifulSoup 把只含空白的文本节点合并为一个换行或空格（<pre>、<textarea> 中除外）
+WHITESPACE_RUN = re.compile(r'[ \t\n\r\f]{2,}|[\t\r\f]')
+ASCII_SPACES = ' \t\n\r\f'
+
+
+def node_text(node):
+    """节点的全部文本，selectolax 的结果与 BeautifulSoup 的 get_text() 相同"""
+    if isinstance(node, Tag):
+        return node.get_text()
+    text = node.text(deep=True)
+    # 大多数单元格没有连续空白，直接使用 lexbor 的结果
+    if not WHITESPACE_RUN.search(text):
+        return text
+    parts = []
+    for child in node.traverse(include_text=True):
+        if child.tag != '-text':
+            continue
+        content = child.text_content
+        if not content.strip(ASCII_SPACES) and (child.parent is None or child.parent.tag not in ('pre', 'textarea')):
+            content = '\n' if '\n' in content else ' '
+        parts.append(content)
+    return ''.join(parts)
+
+
+def select_all(node, names):
+    """按文档顺序查找所有指定标签的子孙节点"""
+    if isinstance(node, Tag):
+        return node.find_all(list(names))
+    return node.css(', '.join(names))
+
+
+def find_links(node):
+    """返回节点下所有链接的 (文字, href, rel列表)"""
+    if isinstance(node, Tag):
+        return [(link.get_text(), link['href'], link.get('rel') or [])
+                for link in node.find_all('a', href=True)]
+    return [(link.text(deep=True), link.attributes.get('href') or '', (link.attributes.get('rel') or '').split())
+            for link in node.css('a[href]')]
+
+
+def table_rows(table):
+    """提取单个表格的非空行"""
+    rows = []
+    for row in select_all(table, ('tr',)):
+        row_data = [node_text(cell).strip() for cell in select_all(row, ('td', 'th'))]
+        if any(row_data):
+            rows.append(row_data)
+    return rows
+
+
+# 与 get_text() 相同，只把正文文本当作标题，跳过注释、<script>、<style>、<template> 和 DOCTYPE
+TEXT_STRING_TYPES = (NavigableString, CData)
+NON_TEXT_TAGS = ('script', 'style', 'template')
+
+
+def iter_text_and_tables(doc):
+    """按文档顺序生成 (文本, None) 或 (None, 表格节点)"""
+    if isinstance(doc, Tag):
+        for node in doc.descendants:
+            if type(node) in TEXT_STRING_TYPES:
+                yield str(node), None
+            elif node.name == 'table':
+                yield None, node
+    else:
+        # selectolax 的注释节点为 -comment，不会当作文本
+        for node in doc.root.traverse(include_text=True):
+            if node.tag == '-text':
+                if node.parent is None or node.parent.tag not in NON_TEXT_TAGS:
+                    yield node.text_content, None
+            elif node.tag == 'table':
+                yield None, node
+
+
+def index_sections(soup, section_names=CASE_SECTIONS):
+    """单次遍历文档，把每处部分标题映射到它后面的第一个表格
+
+    与逐个部分执行 find_all(text=...) + find_next('table') 的结果一致：
+    同一标题出现多次时对应多个表格，多个标题之后紧跟的表格会被各自引用。
+    """
+    section_tables = {name: [] for name in section_names}
+    pending = []
+    for text, table in iter_text_and_tables(soup):
+        if text is not None:
+            pending.extend(name for name in section_names if name in text)
+        elif pending:
+            for name in pending:
+                section_tables[name].append(table)
+            pending = []
+    return section_tables
+
+
+def extract_sections(soup, section_names=CASE_SECTIONS):
+    """按部分提取表格数据，只解析被标题引用到的表格，每个表格只解析一次"""
+    parsed = {}
+    sections = {}
+    for name, tables in index_sections(soup, section_names).items():
+        section_tables = []
+        for table in tables:
+            if id(table) not in parsed:
+                parsed[id(table)] = table_rows(table)
+            if parsed[id(table)]:
+                section_tables.append({'title': name, 'data': parsed[id(table)]})
+        sections[name] = section_tables
+    return sections
+
+
+def extract_tables(doc, table_title=""):
+    """提取页面中所有非空表格，按顺序命名为 表格1、表格2……"""
+    tables_data = []
+    for i, table in enumerate(select_all(doc, ('table',))):
+        table_info = {
+            'title': table_title + f"_表格{i + 1}" if table_title else f"表格{i + 1}",
+            'data': table_rows(table)
+        }
+        if table_info['data']:
+            tables_data.append(table_info)
+    return tables_data
+
+
+def stage_timer(metrics, stage):
+    """metrics 为 None 时不计时"""
+    return metrics.timer(stage) if metrics else contextlib.nullcontext()
+
+
+def build_case_detail(case_number, detail_url, doc, metrics=None):
+    """从解析好的详情页提取各部分表格，返回只含普通类型的案件字典；提取耗时记入 metrics 的 extract_tables"""
+    with stage_timer(metrics, 'extract_tables'):
+        # 一次遍历页面，按上下文标题匹配表格到相应部分
+        sections = extract_sections(doc)
+
+        # 如果无法精确匹配，将所有表格都保存
+        if not any(sections.values()):
+            sections['所有表格'] = extract_tables(doc)
+
+    return {
+        'case_number': case_number,
+        'url': detail_url,
+        'sections': sections
+    }
+
+
+# 页面开头 <meta charset="..."> 或 <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+# 浏览器按这些声明解码时实际使用的超集编码
+CHARSET_ALIASES = {'gb2312': 'gb18030', 'gbk': 'gb18030', 'iso-8859-1': 'cp1252', 'latin-1': 'cp1252'}
+
+
+def normalize_charset(charset):
+    """规范化编码名，Python不支持的编码返回None"""
+    if not charset:
+        return None
+    charset = charset.strip().strip('"\'').lower()
+    charset = CHARSET_ALIASES.get(charset, charset)
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return None
+
+
+class EncodingDetector:
+    """确定响应编码，避免每个页面都对全文做编码识别
+
+    依次使用 Content-Type 响应头中的 charset、页面开头的 <meta charset>、
+    同一主机同一内容类型上次识别出的编码，都没有时才识别一次并记住结果。
+    """
+
+    def __init__(self, sniff_bytes=2048):
+        self.sniff_bytes = sniff_bytes
+        self._learned = {}
+        self._lock = threading.Lock()
+
+    def declared(self, content_type, body):
+        """响应头或 <meta> 中声明的编码"""
+        if content_type:
+            for param in content_type.split(';')[1:]:
+                name, _, value = param.partition('=')
+                if name.strip().lower() == 'charset':
+                    charset = normalize_charset(value)
+                    if charset:
+                        return charset
+        match = META_CHARSET_PATTERN.search(body[:self.sniff_bytes])
+        if match:
+            return normalize_charset(match.group(1).decode('ascii', errors='ignore'))
+        return None
+
+    def detect(self, body):
+        """识别编码（耗时，按主机缓存结果）"""
+        from charset_normalizer import from_bytes
+        best = from_bytes(body).best()
+        return normalize_charset(best.encoding) if best else 'utf-8'
+
+    def decode(self, url, content_type, body):
+        """返回 (文本, 编码)"""
+        charset = self.declared(content_type, body)
+        if charset:
+            return body.decode(charset, errors='replace'), charset
+
+        key = (urlparse(url).netloc, (content_type or '').split(';')[0].strip().lower())
+        with self._lock:
+            charset = self._learned.get(key)
+        if charset:
+            try:
+                return body.decode(charset), charset
+            except UnicodeDecodeError:
+                # 同一主机的页面编码不一致，重新识别
+                pass
+
+        charset = self.detect(body) or 'utf-8'
+        with self._lock:
+            self._learned[key] = charset
+        return body.decode(charset, errors='replace'), charset
+
+
+def parse_case_detail_page(case_number, detail_url, html, parser='html.parser', with_metrics=False):
+    """在解析进程中执行：解析详情页并返回案件字典
+
+    html 是抓取线程按 EncodingDetector 解码后的页面文本。
+    只传入和返回普通类型，可以在 ProcessPoolExecutor 中使用。with_metrics 时返回
+    (案件字典, 解析和提取表格的指标)，指标由主进程用 CrawlMetrics.merge() 合并。
+    """
+    metrics = CrawlMetrics() if with_metrics else None
+    with stage_timer(metrics, 'parse'):
+        doc = parse_html(html, parser)
+    try:
+        case_detail = build_case_detail(case_number, detail_url, doc, metrics)
+    finally:
+        release_html(doc)
+    if metrics:
+        return case_detail, metrics.snapshot()
+    return case_detail
+
+
+class ResponseCache:
+    """磁盘响应缓存
+
+    按 请求方法+URL+请求体 保存压缩后的页面和 ETag/Last-Modified，
+    总大小超过上限时按最近最少使用的顺序淘汰。
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        # 按文件修改时间（每次命中都会更新）恢复LRU顺序
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.cache'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-len('.cache')], stat.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self.total_bytes = sum(self._entries.values())
+        self._evict()
+
+    @staticmethod
+    def make_key(method, url, data=None):
+        """缓存键：请求方法、URL和请求体的哈希"""
+        if isinstance(data, dict):
+            body = urlencode(sorted(data.items()), doseq=True)
+        else:
+            body = data or ''
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', errors='replace')
+        return hashlib.sha256(f"{method.upper()} {url}\n{body}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.cache")
+
+    def get(self, key):
+        """读取缓存条目，返回包含 body 和响应头信息的字典，未命中返回None"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                meta_line, compressed = f.read().split(b'\n', 1)
+            entry = json.loads(meta_line)
+            entry['body'] = zlib.decompress(compressed)
+            os.utime(self._path(key))
+            return entry
+        except (OSError, ValueError, zlib.error):
+            self._remove(key)
+            return None
+
+    def put(self, key, url, body, encoding, etag=None, last_modified=None):
+        """写入缓存条目，必要时淘汰旧条目"""
+        meta = {
+            'url': url,
+            'encoding': encoding,
+            'etag': etag,
+            'last_modified': last_modified,
+            'cached_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        payload = json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n' + zlib.compress(body)
+
+        # 先写临时文件再替换，中途中断不会留下损坏的条目
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.total_bytes += len(payload) - self._entries.pop(key, 0)
+            self._entries[key] = len(payload)
+        self._evict()
+
+    def _evict(self):
+        """淘汰最久未使用的条目，直到总大小不超过上限（至少保留最新的一条）"""
+        evicted = []
+        with self._lock:
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self.total_bytes -= size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _remove(self, key):
+        with self._lock:
+            self.total_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+class ProgressStore:
+    """SQLite 保存的爬取进度
+
+    每完成一个案件只写入一行（WAL 模式，单次提交不需要重写整个文件），
+    多个线程或进程可同时写入，中途崩溃也不会损坏已保存的进度。
+    每提交 checkpoint_every 次把 WAL 日志合并回数据库文件。
+    """
+
+    def __init__(self, db_file, legacy_file=None, checkpoint_every=1000):
+        self.db_file = db_file
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+        self._commits = 0
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS progress (
+            case_number TEXT PRIMARY KEY,
+            fingerprint TEXT,
+            completed_at TEXT
+        )""")
+        if legacy_file:
+            self.import_legacy(legacy_file)
+
+    def import_legacy(self, legacy_file):
+        """首次使用时导入旧版 爬取进度.json"""
+        if not os.path.exists(legacy_file):
+            return
+        if self.conn.execute("SELECT 1 FROM progress LIMIT 1").fetchone():
+            return
+
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"旧版进度文件 {legacy_file} 无法读取，已忽略: {e}")
+            return
+
+        # 旧版进度文件可能只记录了案件编号，没有指纹
+        if isinstance(data, list):
+            data = {case_number: None for case_number in data}
+        with self._lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT OR REPLACE INTO progress VALUES (?, ?, ?)",
+                                  [(case_number, fingerprint, None) for case_number, fingerprint in data.items()])
+            self.conn.execute("COMMIT")
+        print(f"已从 {legacy_file} 导入 {len(data)} 条进度记录")
+
+    def load(self):
+        """返回 案件编号 -> 指纹"""
+        with self._lock:
+            return dict(self.conn.execute("SELECT case_number, fingerprint FROM progress"))
+
+    def __contains__(self, case_number):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM progress WHERE case_number = ?",
+                                     (case_number,)).fetchone() is not None
+
+    def __getitem__(self, case_number):
+        """已完成案件的指纹"""
+        with self._lock:
+            row = self.conn.execute("SELECT fingerprint FROM progress WHERE case_number = ?",
+                                    (case_number,)).fetchone()
+        if row is None:
+            raise KeyError(case_number)
+        return row[0]
+
+    def commit(self, case_number, fingerprint=None):
+        """记录一个已完成的案件"""
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO progress VALUES (?, ?, ?)",
+                              (case_number, fingerprint, time.strftime('%Y-%m-%d %H:%M:%S')))
+            self._commits += 1
+            if self._commits % self.checkpoint_every == 0:
+                self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def compact(self):
+        """把 WAL 日志合并回数据库并清空日志"""
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+class CaseFrontier:
+    """多个进程（可以在不同机器上）共享的案件队列，保存在 SQLite 中
+
+    worker 领取案件时得到 lease_seconds 秒的租约，处理期间定时续约；worker 崩溃后
+    租约过期，案件会被其他 worker 重新领取。案件列表由一个 worker 翻页写入（同样使用
+    租约），其他 worker 同时领取已经写入的案件。失败的案件放回队列，失败 max_attempts
+    次后不再领取。
+    """
+
+    def __init__(self, db_file, lease_seconds=300, max_attempts=3):
+        self.db_file = db_file
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, timeout=60, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS frontier (
+            case_number TEXT PRIMARY KEY,
+            seq INTEGER,
+            case_json TEXT,
+            fingerprint TEXT,
+            state TEXT,
+            worker TEXT,
+            lease_until REAL,
+            attempts INTEGER DEFAULT 0
+        )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, seq)")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS frontier_meta (
+            key TEXT PRIMARY KEY,
+            worker TEXT,
+            lease_until REAL,
+            value TEXT
+        )""")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """写事务：BEGIN IMMEDIATE 先取得写锁，多个进程同时领取时不会拿到同一个案件"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def add(self, entries, refresh=False):
+        """写入案件，entries 为 (案件, 指纹, 是否已完成)；refresh 时指纹变化的已完成案件重新排队"""
+        with self.transaction() as conn:
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM frontier").fetchone()[0]
+            for case, fingerprint, done in entries:
+                case_number = case.get('案件编号', '')
+                case_json = json.dumps(case, ensure_ascii=False)
+                row = conn.execute("SELECT state, fingerprint FROM frontier WHERE case_number = ?",
+                                   (case_number,)).fetchone()
+                if row is None:
+                    seq += 1
+                    conn.execute("INSERT INTO frontier (case_number, seq, case_json, fingerprint, state) "
+                                 "VALUES (?, ?, ?, ?, ?)",
+                                 (case_number, seq, case_json, fingerprint, 'done' if done else 'pending'))
+                elif refresh and row[0] in ('done', 'failed') and row[1] != fingerprint:
+                    conn.execute("UPDATE frontier SET case_json = ?, fingerprint = ?, state = 'pending', "
+                                 "worker = NULL, lease_until = NULL, attempts = 0 WHERE case_number = ?",
+                                 (case_json, fingerprint, case_number))
+
+    def claim(self, worker, n=1):
+        """领取最多 n 个待处理或租约已过期的案件
+
+        租约过期说明上次领取的 worker 崩溃或卡住，同样计一次失败；达到 max_attempts 次后
+        标记为 failed，不再领取，否则会让案件反复拖垮 worker。
+        """
+        now = time.time()
+        claimed = []
+        with self.transaction() as conn:
+            while len(claimed) < n:
+                rows = conn.execute("SELECT case_number, case_json, state, attempts FROM frontier "
+                                    "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+                                    "ORDER BY seq LIMIT ?", (now, n - len(claimed))).fetchall()
+                if not rows:
+                    break
+                for case_number, case_json, state, attempts in rows:
+                    if state == 'leased':
+                        attempts += 1
+                        if attempts >= self.max_attempts:
+                            print(f"案件 {case_number} 的租约已过期 {attempts} 次，标记为失败")
+                            conn.execute("UPDATE frontier SET state = 'failed', attempts = ?, lease_until = NULL "
+                                         "WHERE case_number = ?", (attempts, case_number))
+                            continue
+                    conn.execute("UPDATE frontier SET state = 'leased', worker = ?, lease_until = ?, attempts = ? "
+                                 "WHERE case_number = ?", (worker, now + self.lease_seconds, attempts, case_number))
+                    claimed.append(json.loads(case_json))
+        return claimed
+
+    def heartbeat(self, worker):
+        """为该 worker 的所有租约续期"""
+        lease_until = time.time() + self.lease_seconds
+        with self.transaction() as conn:
+            conn.execute("UPDATE frontier SET lease_until = ? WHERE state = 'leased' AND worker = ?",
+                         (lease_until, worker))
+            conn.execute("UPDATE frontier_meta SET lease_until = ? "
+                         "WHERE key = 'seed' AND worker = ? AND value IS NULL", (lease_until, worker))
+
+    def complete(self, case_number):
+        """案件已保存"""
+        with self.transaction() as conn:
+            conn.execute("UPDATE frontier SET state = 'done', lease_until = NULL WHERE case_number = ?",
+                         (case_number,))
+
+    def fail(self, case_number, worker):
+        """案件处理失败，放回队列；失败次数达到上限后标记为 failed"""
+        with self.transaction() as conn:
+            conn.execute("UPDATE frontier SET attempts = attempts + 1, lease_until = NULL, "
+                         "state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                         "WHERE case_number = ? AND worker = ? AND state = 'leased'",
+                         (self.max_attempts, case_number, worker))
+
+    def claim_seed(self, worker):
+        """领取翻页写入案件列表的任务；列表已写完或其他 worker 正在写入时返回False"""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT worker, lease_until, value FROM frontier_meta WHERE key = 'seed'").fetchone()
+            if row and row[2] == 'done':
+                return False
+            if row and row[0] != worker and row[1] and row[1] > now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO frontier_meta VALUES ('seed', ?, ?, NULL)",
+                         (worker, now + self.lease_seconds))
+        return True
+
+    def release_seed(self, worker, done):
+        """列表写入结束；done 为False（翻页出错）时释放租约，让其他 worker 接手"""
+        with self.transaction() as conn:
+            if done:
+                conn.execute("UPDATE frontier_meta SET value = 'done', lease_until = NULL WHERE key = 'seed'")
+            else:
+                conn.execute("UPDATE frontier_meta SET lease_until = 0 WHERE key = 'seed' AND worker = ?",
+                             (worker,))
+
+    def reset_seed(self):
+        """新一轮爬取：重新翻页获取案件列表"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM frontier_meta WHERE key = 'seed'")
+
+    def seeded(self):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM frontier_meta WHERE key = 'seed'").fetchone()
+        return bool(row and row[0] == 'done')
+
+    def finished(self):
+        """列表已写完，并且没有待处理或处理中的案件"""
+        with self._lock:
+            busy = self.conn.execute("SELECT 1 FROM frontier WHERE state IN ('pending', 'leased') LIMIT 1").fetchone()
+        return not busy and self.seeded()
+
+    def counts(self):
+        """各状态的案件数"""
+        with self._lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state"))
+
+    def iter_states(self, batch_size=1000):
+        """按列表顺序返回 (案件编号, 状态)，分批查询"""
+        seq = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute("SELECT seq, case_number, state FROM frontier WHERE seq > ? "
+                                         "ORDER BY seq LIMIT ?", (seq, batch_size)).fetchall()
+            if not rows:
+                return
+            for seq, case_number, state in rows:
+                yield case_number, state
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def write_case_dir(case_detail, output_dir, fetched_at=None):
+    """按 <输出目录>/<案件编号>/ 的结构保存一个案件：完整JSON、各部分CSV和摘要"""
+    case_number = case_detail['case_number']
+    safe_case_number = re.sub(r'[<>:"/\\|?*]', '_', case_number)
+
+    case_dir = os.path.join(output_dir, safe_case_number)
+    if not os.path.exists(case_dir):
+        os.makedirs(case_dir)
+
+    # 保存JSON格式的完整数据
+    json_file = os.path.join(case_dir, f"{safe_case_number}_完整数据.json")
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(case_detail, f, ensure_ascii=False, indent=2)
+
+    # 为每个部分创建单独的CSV文件
+    for section_name, tables in case_detail['sections'].items():
+        if tables:
+            for i, table in enumerate(tables):
+                csv_filename = f"{safe_case_number}_{section_name}"
+                if len(tables) > 1:
+                    csv_filename += f"_{i + 1}"
+                csv_filename += ".csv"
+
+                csv_file = os.path.join(case_dir, csv_filename)
+
+                with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerows(table['data'])
+
+    # 创建案件摘要文件
+    summary_file = os.path.join(case_dir, f"{safe_case_number}_摘要.txt")
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write(f"案件编号: {case_number}\n")
+        f.write(f"详情页面: {case_detail['url']}\n")
+        f.write(f"数据获取时间: {fetched_at or time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+        f.write("包含的数据部分:\n")
+        for section_name, tables in case_detail['sections'].items():
+            if tables:
+                f.write(f"- {section_name}: {len(tables)} 个表格\n")
+                for table in tables:
+                    f.write(f"  * 表格行数: {len(table['data'])}\n")
+
+    return case_dir
+
+
+class CaseStore:
+    """把所有案件保存在一个 SQLite 数据库中
+
+    案件先放入内存缓冲区，每 batch_size 个或每 flush_interval 秒在一个事务中写入，
+    事务提交后才调用各案件的 on_saved 回调（用于记录爬取进度）。写入失败时回滚事务，
+    这一批案件记入 failed_cases，不调用 on_saved。
+    """
+
+    def __init__(self, db_file, batch_size=100, flush_interval=30):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.time()
+        self.failed_cases = set()
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS cases (
+            case_number TEXT PRIMARY KEY,
+            url TEXT,
+            fetched_at TEXT,
+            detail TEXT
+        )""")
+
+    def add(self, case_detail, on_saved=None):
+        """加入一个案件，缓冲区满时批量写入"""
+        row = (case_detail['case_number'], case_detail.get('url'), time.strftime('%Y-%m-%d %H:%M:%S'),
+               json.dumps(case_detail, ensure_ascii=False, separators=(',', ':')))
+        with self._lock:
+            self._buffer.append((row, on_saved))
+            if len(self._buffer) >= self.batch_size or time.time() - self._last_flush >= self.flush_interval:
+                callbacks = self._flush_locked()
+            else:
+                callbacks = []
+        for callback in callbacks:
+            callback()
+
+    def flush(self):
+        """写入缓冲区中的所有案件"""
+        with self._lock:
+            callbacks = self._flush_locked()
+        for callback in callbacks:
+            callback()
+
+    def _flush_locked(self):
+        self._last_flush = time.time()
+        if not self._buffer:
+            return []
+        batch, self._buffer = self._buffer, []
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany("INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?)", [row for row, _ in batch])
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            self.failed_cases.update(row[0] for row, _ in batch)
+            print(f"批量写入 {len(batch)} 个案件失败，这些案件记为失败")
+            raise
+        # 补充重试时重新保存成功的案件不再算失败
+        self.failed_cases.difference_update(row[0] for row, _ in batch)
+        print(f"已批量写入 {len(batch)} 个案件到 {self.db_file}")
+        return [callback for _, callback in batch if callback]
+
+    def iter_cases(self, case_numbers=None):
+        """逐个返回 (案件详情, 获取时间)"""
+        if case_numbers:
+            placeholders = ','.join('?' * len(case_numbers))
+            cursor = self.conn.execute(
+                f"SELECT detail, fetched_at FROM cases WHERE case_number IN ({placeholders}) ORDER BY case_number",
+                list(case_numbers))
+        else:
+            cursor = self.conn.execute("SELECT detail, fetched_at FROM cases ORDER BY case_number")
+        for detail, fetched_at in cursor:
+            yield json.loads(detail), fetched_at
+
+    def export_case_dirs(self, output_dir, case_numbers=None):
+        """按原来的 <案件编号>/ 文件夹结构导出案件，返回导出数量"""
+        count = 0
+        for case_detail, fetched_at in self.iter_cases(case_numbers):
+            write_case_dir(case_detail, output_dir, fetched_at=fetched_at)
+            count += 1
+        return count
+
+
+class TableBlobStore:
+    """按内容寻址保存表格：相同的表格（如重复的承办信息、核价表模板）只保存一份
+
+    每个表格按行数据的 SHA1 保存为 <blob_dir>/<前两位>/<SHA1>.json，案件文件夹中的
+    <案件编号>_表格引用.json 只记录各部分引用的表格编号，可用 export 还原为完整的文件夹结构。
+    """
+    case_suffix = "_表格引用.json"
+
+    def __init__(self, blob_dir):
+        self.blob_dir = blob_dir
+        self._lock = threading.Lock()
+        # 本次运行中已确认存在的表格，避免重复检查文件
+        self._known = set()
+        if not os.path.exists(self.blob_dir):
+            os.makedirs(self.blob_dir)
+
+    def _path(self, key):
+        return os.path.join(self.blob_dir, key[:2], key + ".json")
+
+    def put(self, rows):
+        """保存表格行数据，返回 (表格编号, 新写入的字节数)；已存在的表格不再写入"""
+        content = json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        key = hashlib.sha1(content).hexdigest()
+        with self._lock:
+            if key in self._known:
+                return key, 0
+        path = self._path(key)
+        written = 0
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，多个线程或进程同时写入同一个表格也不会留下半个文件
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            written = len(content)
+        with self._lock:
+            self._known.add(key)
+        return key, written
+
+    def get(self, key):
+        with open(self._path(key), 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+
+    def pack(self, case_detail):
+        """把案件中的表格换成表格编号，返回 (引用形式的案件, 新写入的字节数)"""
+        written = 0
+        sections = {}
+        for section_name, tables in case_detail['sections'].items():
+            refs = []
+            for table in tables:
+                key, size = self.put(table['data'])
+                written += size
+                refs.append({'title': table['title'], 'table': key, 'rows': len(table['data'])})
+            sections[section_name] = refs
+        return dict(case_detail, sections=sections), written
+
+    def unpack(self, packed):
+        """还原 pack() 之前的案件"""
+        tables = {}
+        sections = {}
+        for section_name, refs in packed['sections'].items():
+            sections[section_name] = []
+            for ref in refs:
+                if ref['table'] not in tables:
+                    tables[ref['table']] = self.get(ref['table'])
+                sections[section_name].append({'title': ref['title'], 'data': tables[ref['table']]})
+        return dict(packed, sections=sections)
+
+    def write_case(self, case_detail, output_dir):
+        """保存案件的表格引用和摘要，返回 (案件目录, 写入的字节数)"""
+        packed, written = self.pack(case_detail)
+        packed['fetched_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        safe_case_number = re.sub(r'[<>:"/\\|?*]', '_', case_detail['case_number'])
+        case_dir = os.path.join(output_dir, safe_case_number)
+        if not os.path.exists(case_dir):
+            os.makedirs(case_dir)
+
+        case_file = os.path.join(case_dir, safe_case_number + self.case_suffix)
+        with open(case_file, 'w', encoding='utf-8') as f:
+            json.dump(packed, f, ensure_ascii=False, indent=2)
+
+        summary_file = os.path.join(case_dir, f"{safe_case_number}_摘要.txt")
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write(f"案件编号: {case_detail['case_number']}\n")
+            f.write(f"详情页面: {case_detail['url']}\n")
+            f.write(f"数据获取时间: {packed['fetched_at']}\n\n")
+            f.write("包含的数据部分:\n")
+            for section_name, refs in packed['sections'].items():
+                if refs:
+                    f.write(f"- {section_name}: {len(refs)} 个表格\n")
+                    for ref in refs:
+                        f.write(f"  * 表格行数: {ref['rows']}\n")
+        return case_dir, written + os.path.getsize(case_file) + os.path.getsize(summary_file)
+
+    def iter_cases(self, output_dir, case_numbers=None):
+        """逐个返回输出目录中保存的 (案件详情, 获取时间)"""
+        wanted = set(case_numbers) if case_numbers else None
+        for entry in sorted(os.scandir(output_dir), key=lambda entry: entry.name):
+            case_file = os.path.join(entry.path, entry.name + self.case_suffix)
+            if not entry.is_dir() or not os.path.exists(case_file):
+                continue
+            with open(case_file, encoding='utf-8') as f:
+                packed = json.load(f)
+            if wanted is not None and packed['case_number'] not in wanted:
+                continue
+            fetched_at = packed.pop('fetched_at', None)
+            yield self.unpack(packed), fetched_at
+
+    def export_case_dirs(self, output_dir, case_numbers=None):
+        """在各案件文件夹中还原完整JSON和各部分CSV，返回导出数量"""
+        count = 0
+        for case_detail, fetched_at in self.iter_cases(output_dir, case_numbers):
+            write_case_dir(case_detail, output_dir, fetched_at=fetched_at)
+            count += 1
+        return count
+
+
+def ndjson_codec(compression):
+    """返回 (文件扩展名, 压缩函数, 解压函数)；zstd 需要 pip install zstandard"""
+    if compression == 'gzip':
+        import gzip
+        return '.ndjson.gz', lambda data: gzip.compress(data, compresslevel=6), gzip.decompress
+    if compression == 'zstd':
+        import zstandard
+        # ZstdCompressor/ZstdDecompressor 不能被多个线程同时使用，每个线程各建一个
+        local = threading.local()
+
+        def compress(data):
+            if not hasattr(local, 'compressor'):
+                local.compressor = zstandard.ZstdCompressor(level=3)
+            return local.compressor.compress(data)
+
+        def decompress(data):
+            if not hasattr(local, 'decompressor'):
+                local.decompressor = zstandard.ZstdDecompressor()
+            return local.decompressor.decompress(data)
+
+        return '.ndjson.zst', compress, decompress
+    raise ValueError(f"不支持的压缩方式: {compression}")
+
+
+class CaseExporter:
+    """爬取过程中把每个案件追加为压缩 NDJSON 的一行，按大小轮换文件
+
+    每个案件单独压缩成一个 gzip 成员（zstd 为一个帧），整个文件仍可用 zcat、gzip.open
+    或 pandas.read_json(lines=True) 直接读取；同名的 .idx 文件每行记录
+    “案件编号<TAB>偏移<TAB>长度”，用于按案件编号直接定位。中断后再次运行时丢弃
+    没有写进索引的半条记录，继续追加到最后一个文件。
+    """
+
+    def __init__(self, export_dir, compression='gzip', rotate_mb=256, prefix="案件导出"):
+        self.export_dir = export_dir
+        self.rotate_bytes = rotate_mb * 1024 * 1024
+        self.prefix = prefix
+        self.suffix, self._compress, _ = ndjson_codec(compression)
+        self._lock = threading.Lock()
+        self._data = None
+        self._index = None
+        if not os.path.exists(self.export_dir):
+            os.makedirs(self.export_dir)
+
+        part_pattern = re.compile(re.escape(prefix) + r'-(\d{5})' + re.escape(self.suffix))
+        parts = [int(m.group(1)) for m in map(part_pattern.fullmatch, os.listdir(self.export_dir)) if m]
+        self.part_no = max(parts, default=1)
+        self._open_part()
+
+    def part_path(self, part_no):
+        return os.path.join(self.export_dir, f"{self.prefix}-{part_no:05d}{self.suffix}")
+
+    def _open_part(self):
+        """打开当前编号的文件，截掉索引之后的未完成内容"""
+        data_path = self.part_path(self.part_no)
+        index_path = data_path + ".idx"
+        end = 0
+        lines = []
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    if not line.endswith('\n') or len(fields) != 3:
+                        break
+                    lines.append(line)
+                    end = int(fields[1]) + int(fields[2])
+        with open(index_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        with open(data_path, 'ab') as f:
+            f.truncate(end)
+
+        self._data = open(data_path, 'ab')
+        self._index = open(index_path, 'a', encoding='utf-8')
+        self.offset = end
+
+    def write(self, case_detail):
+        """追加一个案件，返回写入的字节数"""
+        line = json.dumps(case_detail, ensure_ascii=False, separators=(',', ':')) + '\n'
+        record = self._compress(line.encode('utf-8'))
+        with self._lock:
+            if self._data is None:
+                # close() 之后再写入时重新打开最后一个文件
+                self._open_part()
+            if self.offset and self.offset + len(record) > self.rotate_bytes:
+                self.close()
+                self.part_no += 1
+                self._open_part()
+            self._data.write(record)
+            self._data.flush()
+            # 数据写完后再写索引，索引中的记录一定完整
+            self._index.write(f"{case_detail['case_number']}\t{self.offset}\t{len(record)}\n")
+            self._index.flush()
+            self.offset += len(record)
+        return len(record)
+
+    def close(self):
+        if self._data:
+            self._data.close()
+            self._index.close()
+            self._data = self._index = None
+
+
+class CaseExportReader:
+    """读取 CaseExporter 的导出文件：按写入顺序遍历案件，或按案件编号直接读取
+
+    同一个案件导出了多次（如增量模式重新爬取）时以最后一次为准。分布式模式下各 worker
+    的文件（案件导出-<worker>-00001.ndjson.gz）一并读取。
+    """
+
+    def __init__(self, export_dir, compression='gzip', prefix="案件导出"):
+        self.export_dir = export_dir
+        self.suffix, _, self._decompress = ndjson_codec(compression)
+        self.parts = sorted(os.path.join(export_dir, name) for name in os.listdir(export_dir)
+                            if name.startswith(prefix + "-") and name.endswith(self.suffix))
+        self._index = None
+
+    def _read_index(self, data_path):
+        with open(data_path + ".idx", encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) == 3:
+                    yield fields[0], int(fields[1]), int(fields[2])
+
+    @property
+    def index(self):
+        """案件编号 -> (文件, 偏移, 长度)"""
+        if self._index is None:
+            self._index = {}
+            for data_path in self.parts:
+                for case_number, offset, length in self._read_index(data_path):
+                    self._index[case_number] = (data_path, offset, length)
+        return self._index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, case_number):
+        return case_number in self.index
+
+    def _read_record(self, f, offset, length):
+        f.seek(offset)
+        return json.loads(self._decompress(f.read(length)))
+
+    def get(self, case_number):
+        """按案件编号读取一个案件，不存在时返回 None"""
+        location = self.index.get(case_number)
+        if location is None:
+            return None
+        data_path, offset, length = location
+        with open(data_path, 'rb') as f:
+            return self._read_record(f, offset, length)
+
+    def __iter__(self):
+        """按写入顺序逐个返回案件，跳过被后来的记录覆盖的旧版本"""
+        index = self.index
+        for data_path in self.parts:
+            with open(data_path, 'rb') as f:
+                for case_number, offset, length in self._read_index(data_path):
+                    if index.get(case_number) == (data_path, offset, length):
+                        yield self._read_record(f, offset, length)
+
+
+class AdaptiveRateLimiter:
+    """按主机自适应调整请求速率（AIMD）
+
+    每个主机的速率（次/秒）限制在 [min_rate, max_rate] 之间：响应正常且延迟低于
+    target_latency 时每次加 increase；遇到 429/5xx 或超时乘以 decrease，
+    延迟偏高时乘以 slow_decrease。host_limits 可为个别主机单独设置 (min_rate, max_rate)。
+
+    请求不预约将来的发送时间：等待中的请求每隔最多 poll_interval 秒按当前速率重新检查，
+    速率的调整对已经在等待的请求也立即生效。
+    """
+
+    def __init__(self, initial_rate=0.5, min_rate=0.1, max_rate=10.0, increase=0.1, decrease=0.5,
+                 slow_decrease=0.8, target_latency=2.0, host_limits=None, poll_interval=0.5):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_decrease = slow_decrease
+        self.target_latency = target_latency
+        self.host_limits = host_limits or {}
+        self.poll_interval = poll_interval
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, url):
+        host = urlparse(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            low, high = self.host_limits.get(host, (self.min_rate, self.max_rate))
+            state = {'rate': min(max(self.initial_rate, low), high), 'last_time': float('-inf'), 'low': low, 'high': high}
+            self._hosts[host] = state
+        return state
+
+    def try_acquire(self, url):
+        """按当前速率检查现在能否发送请求：可以时记下发送时间并返回0，否则返回下次检查前等待的秒数"""
+        with self._lock:
+            state = self._state(url)
+            now = time.monotonic()
+            wait = state['last_time'] + 1.0 / state['rate'] - now
+            if wait > 0:
+                return min(wait, self.poll_interval)
+            state['last_time'] = now
+            return 0.0
+
+    def acquire(self, url):
+        """等待到允许发送请求"""
+        wait = self.try_acquire(url)
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.try_acquire(url)
+
+    def record(self, url, latency=None, status=None, error=False):
+        """根据响应情况调整该主机的速率"""
+        with self._lock:
+            state = self._state(url)
+            if error or status == 429 or (status is not None and status >= 500):
+                state['rate'] *= self.decrease
+            elif latency is not None and latency > self.target_latency:
+                state['rate'] *= self.slow_decrease
+            else:
+                state['rate'] += self.increase
+            state['rate'] = min(max(state['rate'], state['low']), state['high'])
+
+    def rate(self, url):
+        """当前速率（次/秒）"""
+        with self._lock:
+            return self._state(url)['rate']
+
+
+class RetryPolicy:
+    """请求重试策略：带随机抖动的指数退避，整次运行的重试总次数受 retry_budget 限制"""
+
+    def __init__(self, max_retries=3, base_delay=1.0, max_delay=30.0, retry_budget=200,
+                 retry_statuses=(429, 500, 502, 503, 504)):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.retry_statuses = retry_statuses
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt, retry_after=None):
+        """第 attempt 次重试前的等待秒数（full jitter），服务器给出 Retry-After 时不少于该值"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_delay))
+        return delay
+
+    def take_budget(self):
+        """消耗一次重试额度，额度用完返回False"""
+        with self._lock:
+            if self.retry_budget <= 0:
+                return False
+            self.retry_budget -= 1
+            return True
+
+
+class CircuitBreaker:
+    """熔断器：连续失败 failure_threshold 次后所有线程暂停请求 reset_timeout 秒，
+    之后放行请求试探，成功则恢复，失败则再次暂停"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait_time(self):
+        """距离允许请求还需等待的秒数"""
+        with self._lock:
+            return max(0.0, self.opened_until - time.monotonic())
+
+    def before_request(self):
+        """熔断期间阻塞等待"""
+        wait = self.wait_time()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.wait_time()
+
+    def record_success(self):
+        with self._lock:
+            if self.failures >= self.failure_threshold:
+                print("服务器已恢复，继续请求")
+            self.failures = 0
+            self.opened_until = 0.0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_until = time.monotonic() + self.reset_timeout
+                print(f"连续失败 {self.failures} 次，服务器可能不可用，暂停所有请求 {self.reset_timeout:.0f} 秒")
+
+
+class CrawlMetrics:
+    """运行指标：各阶段耗时分布、字节数和错误数
+
+    阶段耗时按 buckets（秒）累计为直方图，分位数按桶内线性插值估算。
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """记录一次阶段耗时"""
+        with self._lock:
+            state = self._stages.get(stage)
+            if state is None:
+                state = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * (len(self.buckets) + 1)}
+                self._stages[stage] = state
+            state['count'] += 1
+            state['sum'] += seconds
+            state['max'] = max(state['max'], seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            state['buckets'][i] += 1
+
+    def count(self, name, n=1):
+        """计数器加 n"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        """记录代码块耗时，出现异常时 <阶段>_errors 加一"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count(f"{stage}_errors")
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def merge(self, snapshot):
+        """合并另一个进程的 snapshot()，用于汇总多个 worker 的指标"""
+        with self._lock:
+            for stage, data in snapshot['stages'].items():
+                state = self._stages.setdefault(
+                    stage, {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * (len(self.buckets) + 1)})
+                state['count'] += data['count']
+                state['sum'] += data['total_seconds']
+                state['max'] = max(state['max'], data['max_seconds'])
+                for i, n in enumerate(data['buckets'].values()):
+                    state['buckets'][i] += n
+            for name, value in snapshot['counters'].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def _quantile(self, state, q):
+        rank = q * state['count']
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(state['buckets']):
+            upper = self.buckets[i] if i < len(self.buckets) else state['max']
+            if n and seen + n >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / n, state['max'])
+            seen += n
+            lower = upper
+        return state['max']
+
+    def snapshot(self):
+        """返回可以写入JSON的指标字典"""
+        with self._lock:
+            stages = {}
+            for stage, state in self._stages.items():
+                stages[stage] = {
+                    'count': state['count'],
+                    'total_seconds': round(state['sum'], 6),
+                    'mean_seconds': round(state['sum'] / state['count'], 6),
+                    'p50_seconds': round(self._quantile(state, 0.5), 6),
+                    'p90_seconds': round(self._quantile(state, 0.9), 6),
+                    'p99_seconds': round(self._quantile(state, 0.99), 6),
+                    'max_seconds': round(state['max'], 6),
+                    'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], state['buckets'])),
+                }
+            return {
+                'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at)),
+                'elapsed_seconds': round(time.time() - self.started_at, 3),
+                'stages': stages,
+                'counters': dict(self._counters),
+            }
+
+    def to_prometheus(self, prefix='zmjg'):
+        """Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+            for stage, state in self._stages.items():
+                cumulative = 0
+                for bound, n in zip([str(b) for b in self.buckets] + ['+Inf'], state['buckets']):
+                    cumulative += n
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {state["sum"]:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {state["count"]}')
+            for name, value in self._counters.items():
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+
+class ReportLog:
+    """按列表顺序把案件编号追加到临时文件，生成报告时再逐行读出，不在内存中保存整个案件列表"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def add(self, case_number):
+        with self._lock:
+            self._file.write(case_number.replace('\n', ' ') + '\n')
+            self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        with self._lock:
+            self._file.flush()
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                yield line.rstrip('\n')
+
+    def close(self):
+        """删除临时文件"""
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
 
 
 class ZMJGCaseScraper:
-    def __init__(self, username, password):
+    def __init__(self, username, password, max_workers=1, parser='html.parser', output_dir="案件数据",
+                 cache_mode=None, cache_size_mb=512, storage='files', writer_threads=0, write_queue_size=100,
+                 rate_limiter=None, retry_policy=None, circuit_breaker=None, deferred_retry=True,
+                 persist_session=True, parse_processes=0, metrics_prometheus=False, profile=False,
+                 export_ndjson=None, export_rotate_mb=256):
         self.base_url = "http://zmjg.zm.sc.yc"
         self.username = username
         self.password = password
@@ -23,33 +1370,294 @@ class ZMJGCaseScraper:
         })
         self.is_logged_in = False
 
+        # 登录后的 Cookie 保存到文件，下次启动先验证保存的会话，失效时才重新登录
+        self.persist_session = persist_session
+        # 每次重新登录加一，用于多个线程同时发现会话过期时只登录一次
+        self._session_generation = 0
+        self._login_lock = threading.Lock()
+        self._local = threading.local()
+
+        # 案件列表和详情页使用的解析后端；登录表单等少量页面始终使用 BeautifulSoup
+        if parser not in PARSER_BACKENDS:
+            raise ValueError(f"不支持的解析后端: {parser}，可选: {', '.join(PARSER_BACKENDS)}")
+        self.parser = parser
+        self.soup_parser = parser if parser != 'selectolax' else 'html.parser'
+
+        # 并发抓取详情页的线程数，1 表示按顺序逐个抓取
+        self.max_workers = max(1, int(max_workers))
+        # 所有线程共用的自适应限速器，初始约每2秒一个请求，随服务器响应情况自动调整
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        # 临时错误（超时、连接失败、429/5xx）按退避策略重试；服务器持续失败时熔断
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # 全部案件处理完后，对失败的案件再统一重试一轮
+        self.deferred_retry = deferred_retry
+        # 所有线程共用同一个 Session，连接池大小与线程数一致
+        adapter = HTTPAdapter(pool_maxsize=max(self.max_workers, 10))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+
+        # 案件列表分页：下一页链接的文字，以及找不到链接时使用的页码参数名（如 'page'）
+        self.next_page_texts = ('下一页', '下页', '后页', '>', '›', '»')
+        self.list_page_param = None
+        self.max_list_pages = 10000
+
         # 创建保存案件的目录
-        self.output_dir = "案件数据"
+        self.output_dir = output_dir
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
+        self.cookie_file = os.path.join(self.output_dir, "会话.json")
+
+        # 网页缓存：None 不使用；'revalidate' 使用缓存并用条件请求确认页面未变；
+        # 'offline' 只读缓存不访问网络，用于重新解析已抓取的页面
+        if cache_mode not in (None, 'revalidate', 'offline'):
+            raise ValueError(f"不支持的缓存模式: {cache_mode}")
+        self.cache_mode = cache_mode
+        self.encodings = EncodingDetector()
+        self.cache = None
+        if cache_mode:
+            self.cache = ResponseCache(os.path.join(self.output_dir, "网页缓存"),
+                                       max_bytes=cache_size_mb * 1024 * 1024)
+
+        # 案件存储方式：'files' 每个案件一个文件夹；'sqlite' 批量写入 案件数据.db，可再导出为文件夹；
+        # 'blobs' 相同的表格只在 表格/ 中保存一份，案件文件夹只记录引用，可再导出为完整文件夹
+        if storage not in ('files', 'sqlite', 'blobs'):
+            raise ValueError(f"不支持的存储方式: {storage}")
+        self.storage = storage
+        self.case_store = None
+        self.table_store = None
+        if storage == 'sqlite':
+            self.case_store = CaseStore(os.path.join(self.output_dir, "案件数据.db"))
+        elif storage == 'blobs':
+            self.table_store = TableBlobStore(os.path.join(self.output_dir, "表格"))
+
+        # 流式导出：None 不导出；'gzip' 或 'zstd' 时每个案件另外追加到 导出/案件导出-00001.ndjson.gz，
+        # 文件超过 export_rotate_mb 后换下一个文件，便于下游程序顺序读取或按案件编号定位
+        self.case_exporter = None
+        if export_ndjson:
+            self.case_exporter = CaseExporter(os.path.join(self.output_dir, "导出"), compression=export_ndjson,
+                                              rotate_mb=export_rotate_mb)
+
+        # 写入线程数：0 表示抓取线程直接保存；大于0时抓取线程只把解析结果放入有界队列，
+        # 由写入线程保存案件并记录进度，队列满时抓取线程等待
+        self.writer_threads = max(0, int(writer_threads))
+        self.write_queue_size = write_queue_size
+        self._write_queue = None
+        self._writers = []
+        self._write_failures = set()
+
+        # 解析进程数：0 表示在抓取线程中解析；大于0时详情页文本交给进程池解析，
+        # 解析不再受GIL限制，可以用满多个CPU核
+        self.parse_processes = max(0, int(parse_processes))
+        self._parse_pool = None
+
+        # 运行指标保存到 运行概况.json；metrics_prometheus 时另存 Prometheus 文本，
+        # profile 时用 cProfile 分析各抓取线程，结果保存到 运行分析.prof / 运行分析.txt
+        self.metrics = CrawlMetrics()
+        self.metrics_prometheus = metrics_prometheus
+        self.profile = profile
+        self._profilers = []
+        self._profile_local = threading.local()
+
+    def get_page(self, url, data=None, method='GET', parser=None, use_cache=True):
+        """获取页面内容，parser 为空时使用实例的解析后端"""
+        html = self.fetch_html(url, data=data, method=method, use_cache=use_cache)
+        if html is None:
+            return None
+        with self.metrics.timer('parse'):
+            return parse_html(html, parser or self.parser)
+
+    def decode_response(self, url, content_type, body):
+        """解码响应内容，返回 (文本, 编码)，同时记录字节数和解码耗时"""
+        self.metrics.count('bytes_received', len(body))
+        with self.metrics.timer('decode'):
+            return self.encodings.decode(url, content_type, body)
+
+    def fetch_html(self, url, data=None, method='GET', use_cache=True, relogin=True):
+        """获取页面文本，启用缓存时优先使用缓存；会话过期时自动重新登录并重试一次"""
+        generation = self._session_generation
+        cache = self.cache if use_cache else None
+        key = entry = None
+        if cache:
+            key = cache.make_key(method, url, data)
+            entry = cache.get(key)
+            if self.cache_mode == 'offline':
+                if entry is None:
+                    print(f"缓存中没有该页面: {url}")
+                    self.metrics.count('cache_misses')
+                    return None
+                self.metrics.count('cache_hits')
+                return entry['body'].decode(entry['encoding'], errors='replace')
+
+        # 条件请求：页面未变化时服务器返回304，不再传输页面内容
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.send_request(url, data=data, method=method, headers=headers)
+        if response is None:
+            return None
 
-    def get_page(self, url, data=None, method='GET'):
-        """获取页面内容"""
-        try:
-            print(f"正在访问: {url}")
-            if method.upper() == 'POST':
-                response = self.session.post(url, data=data, timeout=15)
-            else:
-                response = self.session.get(url, timeout=15)
+        if entry and response.status_code == 304:
+            print(f"页面未变化，使用缓存: {url}")
+            self.metrics.count('not_modified')
+            return entry['body'].decode(entry['encoding'], errors='replace')
 
+        try:
             response.raise_for_status()
-            response.encoding = response.apparent_encoding or 'utf-8'
-            return BeautifulSoup(response.text, 'html.parser')
-        except requests.RequestException as e:
+        except requests.HTTPError as e:
             print(f"请求失败: {e}")
+            self.metrics.count('http_errors')
             return None
 
-    def login(self):
-        """登录系统"""
+        html, response.encoding = self.decode_response(response.url, response.headers.get('Content-Type'),
+                                                       response.content)
+
+        # 登录页面不能当作案件数据，也不能写入缓存
+        if self.session_expired(response.url, bool(response.history), html):
+            self.metrics.count('session_expired')
+            if relogin and self.relogin(generation):
+                return self.fetch_html(url, data=data, method=method, use_cache=use_cache, relogin=False)
+            print(f"会话已失效，无法获取: {url}")
+            return None
+
+        if cache:
+            cache.put(key, url, response.content, response.encoding,
+                      etag=response.headers.get('ETag'),
+                      last_modified=response.headers.get('Last-Modified'))
+        return html
+
+    def send_request(self, url, data=None, method='GET', headers=None):
+        """发送请求：经过熔断器和限速器，临时错误按重试策略退避重试
+
+        返回 requests 的响应（可能是非重试类的错误状态码），多次重试仍失败返回None。
+        """
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_request()
+            with self.metrics.timer('rate_limit_wait'):
+                self.rate_limiter.acquire(url)
+
+            retry_after = None
+            try:
+                print(f"正在访问: {url}")
+                start = time.monotonic()
+                if method.upper() == 'POST':
+                    response = self.session.post(url, data=data, headers=headers, timeout=15)
+                else:
+                    response = self.session.get(url, headers=headers, timeout=15)
+            except requests.RequestException as e:
+                # 超时和连接错误
+                self.rate_limiter.record(url, error=True)
+                self.circuit_breaker.record_failure()
+                self.metrics.count('request_errors')
+                error = e
+            else:
+                latency = time.monotonic() - start
+                self.rate_limiter.record(url, latency, response.status_code)
+                self.metrics.observe('request', latency)
+                if response.status_code not in policy.retry_statuses:
+                    self.circuit_breaker.record_success()
+                    return response
+                self.circuit_breaker.record_failure()
+                self.metrics.count('http_retryable_errors')
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get('Retry-After')
+
+            if attempt >= policy.max_retries or not policy.take_budget():
+                print(f"请求失败: {error}")
+                self.metrics.count('failed_requests')
+                return None
+
+            delay = policy.backoff(attempt, retry_after)
+            attempt += 1
+            print(f"请求失败: {error}，{delay:.1f} 秒后第 {attempt} 次重试")
+            self.metrics.count('retries')
+            time.sleep(delay)
+
+    def session_expired(self, final_url, redirected, html):
+        """登录后的请求被重定向到登录页或返回了登录表单，说明会话已过期"""
+        if not self.is_logged_in or getattr(self._local, 'logging_in', False):
+            return False
+        if redirected and 'login' in final_url.lower():
+            return True
+        return is_login_form(html)
+
+    def relogin(self, generation):
+        """会话过期时重新登录；其他线程已经重新登录过则直接返回"""
+        with self._login_lock:
+            if self._session_generation != generation:
+                return True
+            print("会话已过期，正在重新登录...")
+            self.session.cookies.clear()
+            return self.login(use_saved=False)
+
+    def save_cookies(self):
+        """保存当前会话的 Cookie"""
+        cookies = [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path,
+                    'expires': c.expires, 'secure': c.secure} for c in self.session.cookies]
+        # 分布式模式下多个 worker 共用输出目录，临时文件按进程和线程区分
+        tmp_file = f"{self.cookie_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cookies, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cookie_file)
+
+    def restore_session(self):
+        """加载保存的 Cookie，并访问一次主页确认会话仍然有效"""
+        if not os.path.exists(self.cookie_file):
+            return False
+        try:
+            with open(self.cookie_file, 'r', encoding='utf-8') as f:
+                for c in json.load(f):
+                    self.session.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'],
+                                             expires=c['expires'], secure=c['secure'])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"保存的会话无法读取: {e}")
+            return False
+
+        html = self.fetch_html(self.base_url, use_cache=False)
+        if html and not is_login_form(html):
+            print("已恢复保存的会话，无需重新登录")
+            return True
+
+        print("保存的会话已失效，重新登录")
+        self.session.cookies.clear()
+        return False
+
+    def login(self, use_saved=True):
+        """登录系统，优先使用保存的会话"""
+        if self.cache_mode == 'offline':
+            print("离线模式，使用缓存页面，跳过登录")
+            self.is_logged_in = True
+            return True
+
+        self._local.logging_in = True
+        try:
+            if use_saved and self.persist_session and self.restore_session():
+                ok = True
+            else:
+                ok = self.login_with_form()
+        finally:
+            self._local.logging_in = False
+
+        if ok:
+            self.is_logged_in = True
+            self._session_generation += 1
+            if self.persist_session:
+                self.save_cookies()
+        return ok
+
+    def login_with_form(self):
+        """填写登录表单，使用用户名和密码登录"""
         print("正在尝试登录...")
 
-        # 首先访问主页获取登录表单
-        soup = self.get_page(self.base_url)
+        # 首先访问主页获取登录表单（含一次性令牌，不使用缓存）
+        soup = self.get_page(self.base_url, parser=self.soup_parser, use_cache=False)
         if not soup:
             print("无法访问主页")
             return False
@@ -102,13 +1710,13 @@ class ZMJGCaseScraper:
                 login_data[field['name']] = field['value']
 
         # 执行登录
-        login_response = self.get_page(login_url, data=login_data, method='POST')
+        login_response = self.get_page(login_url, data=login_data, method='POST', parser=self.soup_parser,
+                                       use_cache=False)
 
         if login_response:
             # 检查是否登录成功
             if '登录' not in login_response.get_text() or '案件' in login_response.get_text():
                 print("登录成功！")
-                self.is_logged_in = True
                 return True
             else:
                 print("登录失败，请检查用户名和密码")
@@ -120,7 +1728,7 @@ class ZMJGCaseScraper:
     def get_case_list_url(self):
         """获取案件列表页面URL"""
         # 访问主页查找案件菜单
-        soup = self.get_page(self.base_url)
+        soup = self.get_page(self.base_url, parser=self.soup_parser)
         if not soup:
             return None
 
@@ -145,33 +1753,98 @@ class ZMJGCaseScraper:
         return possible_urls[0]
 
     def get_case_list(self):
-        """获取案件列表"""
+        """获取案件列表（包含所有分页）"""
+        cases_list = list(self.iter_case_list())
+        print(f"共找到 {len(cases_list)} 个案件")
+        return cases_list
+
+    def iter_case_list(self):
+        """逐页生成案件，处理当前页时后台预取下一页"""
         if not self.is_logged_in:
             print("请先登录")
-            return []
+            return
 
         case_list_url = self.get_case_list_url()
         if not case_list_url:
             print("无法找到案件列表页面")
-            return []
+            return
 
-        soup = self.get_page(case_list_url)
-        if not soup:
-            return []
+        seen_urls = {case_list_url}
+        last_page_cases = set()
+        page_url = case_list_url
+        page_no = 1
+
+        # 单线程预取：当前页的案件分发给详情线程时，下一页已经在请求中
+        prefetcher = ThreadPoolExecutor(max_workers=1)
+        future = prefetcher.submit(self.get_page, page_url)
+        try:
+            while future is not None:
+                soup = future.result()
+                future = None
+                if not soup:
+                    break
+
+                # 跳过上一页已出现过的案件，服务器忽略分页参数、反复返回同一页时也能正常结束；
+                # 只记住上一页的案件编号，内存占用不随案件总数增长
+                page_cases = []
+                page_case_numbers = set()
+                for case in self.parse_case_list(soup):
+                    if case['案件编号'] not in last_page_cases and case['案件编号'] not in page_case_numbers:
+                        page_case_numbers.add(case['案件编号'])
+                        page_cases.append(case)
+                last_page_cases = page_case_numbers
+                print(f"案件列表第 {page_no} 页: {len(page_cases)} 个案件")
+
+                next_url = self.find_next_page_url(soup, page_url, page_no) if page_cases else None
+                # 案件和下一页链接都已取出，分发本页案件前先释放解析树
+                release_html(soup)
+                soup = None
+                if not page_cases:
+                    break
+
+                if next_url and next_url not in seen_urls and page_no < self.max_list_pages:
+                    seen_urls.add(next_url)
+                    page_url = next_url
+                    page_no += 1
+                    future = prefetcher.submit(self.get_page, page_url)
+
+                for case in page_cases:
+                    yield case
+        finally:
+            prefetcher.shutdown(wait=False, cancel_futures=True)
+
+    def find_next_page_url(self, soup, page_url, page_no):
+        """查找下一页链接，找不到时按分页参数构造"""
+        for text, href, rel in find_links(soup):
+            href = href.strip()
+            if not href or href.startswith('javascript') or href == '#':
+                continue
+            if 'next' in rel or text.strip() in self.next_page_texts:
+                return urljoin(page_url, href)
+
+        if self.list_page_param:
+            parts = urlparse(page_url)
+            query = parse_qs(parts.query)
+            query[self.list_page_param] = [str(page_no + 1)]
+            return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
 
+        return None
+
+    def parse_case_list(self, soup):
+        """解析一页案件列表"""
         cases_list = []
 
         # 查找案件表格
-        tables = soup.find_all('table')
+        tables = select_all(soup, ('table',))
 
         for table in tables:
-            rows = table.find_all('tr')
+            rows = select_all(table, ('tr',))
             if len(rows) < 2:
                 continue
 
             # 获取表头
             header_row = rows[0]
-            headers = [th.get_text().strip() for th in header_row.find_all(['th', 'td'])]
+            headers = [node_text(th).strip() for th in select_all(header_row, ('th', 'td'))]
 
             # 检查是否是案件表格
             case_headers = ['案件编号', '查获单位', '承办部门', '查获部门', '当事人', '许可证号',
@@ -184,241 +1857,399 @@ class ZMJGCaseScraper:
 
             # 提取案件数据
             for row in rows[1:]:
-                cells = row.find_all(['td', 'th'])
+                cells = select_all(row, ('td', 'th'))
                 if len(cells) >= len(headers):
                     case_data = {}
 
                     for i, cell in enumerate(cells):
                         if i < len(headers):
-                            case_data[headers[i]] = cell.get_text().strip()
+                            case_data[headers[i]] = node_text(cell).strip()
 
                     # 查找详情链接
                     detail_links = []
                     for cell in cells:
-                        links = cell.find_all('a', href=True)
-                        for link in links:
-                            link_text = link.get_text().strip()
+                        for link_text, href, _ in find_links(cell):
+                            link_text = link_text.strip()
                             if '案件在办' in link_text or '详情' in link_text or '查看' in link_text:
-                                detail_links.append(urljoin(self.base_url, link['href']))
+                                detail_links.append(urljoin(self.base_url, href))
 
                     case_data['详情链接'] = detail_links
 
                     if case_data.get('案件编号'):
                         cases_list.append(case_data)
 
-        print(f"共找到 {len(cases_list)} 个案件")
         return cases_list
 
     def extract_table_data(self, soup, table_title=""):
         """提取表格数据"""
-        tables_data = []
-        tables = soup.find_all('table')
-
-        for i, table in enumerate(tables):
-            table_info = {
-                'title': table_title + f"_表格{i + 1}" if table_title else f"表格{i + 1}",
-                'data': []
-            }
-
-            rows = table.find_all('tr')
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                row_data = [cell.get_text().strip() for cell in cells]
-                if any(row_data):
-                    table_info['data'].append(row_data)
-
-            if table_info['data']:
-                tables_data.append(table_info)
-
-        return tables_data
+        with self.metrics.timer('extract_tables'):
+            return extract_tables(soup, table_title)
 
     def get_case_detail(self, case_number, detail_url):
         """获取案件详情"""
         print(f"正在获取案件 {case_number} 的详情...")
 
+        if self._parse_pool:
+            # 抓取线程只负责下载，解析在进程池中进行，等待结果时不占用GIL
+            html = self.fetch_html(detail_url)
+            if html is None:
+                return None
+            with self.metrics.timer('parse_process'):
+                case_detail, snapshot = self._parse_pool.submit(parse_case_detail_page, case_number, detail_url,
+                                                                html, self.parser, True).result()
+            self.metrics.merge(snapshot)
+            return case_detail
+
         soup = self.get_page(detail_url)
         if not soup:
             return None
 
-        case_detail = {
-            'case_number': case_number,
-            'url': detail_url,
-            'sections': {}
-        }
-
-        # 定义案件的各个部分
-        sections = {
-            '案件信息': [],
-            '涉案人信息': [],
-            '涉案物品': [],
-            '运输信息': [],
-            '承办信息': [],
-            '举报记录表': [],
-            '涉案物品核价表': [],
-            '物品确认': [],
-            '结案报告表': []
-        }
-
-        # 查找页面中的所有表格
-        all_tables = self.extract_table_data(soup)
-
-        # 尝试根据上下文文本匹配表格到相应部分
-        page_text = soup.get_text()
-
-        for section_name in sections.keys():
-            if section_name in page_text:
-                # 查找该部分对应的表格
-                section_tables = []
-
-                # 查找包含该部分名称的元素
-                section_elements = soup.find_all(text=re.compile(section_name))
-
-                for element in section_elements:
-                    parent = element.parent
-                    # 查找该元素后面的表格
-                    next_table = parent.find_next('table')
-                    if next_table:
-                        table_data = []
-                        rows = next_table.find_all('tr')
-                        for row in rows:
-                            cells = row.find_all(['td', 'th'])
-                            row_data = [cell.get_text().strip() for cell in cells]
-                            if any(row_data):
-                                table_data.append(row_data)
-
-                        if table_data:
-                            section_tables.append({
-                                'title': section_name,
-                                'data': table_data
-                            })
-
-                sections[section_name] = section_tables
-
-        # 如果无法精确匹配，将所有表格都保存
-        if not any(sections.values()):
-            sections['所有表格'] = all_tables
+        try:
+            return self.parse_case_detail(case_number, detail_url, soup)
+        finally:
+            release_html(soup)
 
-        case_detail['sections'] = sections
+    def parse_case_detail(self, case_number, detail_url, soup):
+        """从详情页解析出各部分表格"""
+        return build_case_detail(case_number, detail_url, soup, self.metrics)
 
-        return case_detail
+    def start_parse_pool(self):
+        """启动解析进程池"""
+        if not self.parse_processes:
+            return
+        # 抓取和写入线程已经在运行，用 spawn 启动子进程，避免 fork 复制持有中的锁
+        self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_processes,
+                                               mp_context=multiprocessing.get_context('spawn'))
+        print(f"使用 {self.parse_processes} 个进程解析详情页")
+
+    def stop_parse_pool(self):
+        """关闭解析进程池"""
+        if self._parse_pool is None:
+            return
+        self._parse_pool.shutdown(cancel_futures=True)
+        self._parse_pool = None
 
     def save_case_to_files(self, case_detail):
         """将案件信息保存到文件"""
-        case_number = case_detail['case_number']
-        safe_case_number = re.sub(r'[<>:"/\\|?*]', '_', case_number)
-
-        case_dir = os.path.join(self.output_dir, safe_case_number)
-        if not os.path.exists(case_dir):
-            os.makedirs(case_dir)
-
-        # 保存JSON格式的完整数据
-        json_file = os.path.join(case_dir, f"{safe_case_number}_完整数据.json")
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(case_detail, f, ensure_ascii=False, indent=2)
+        case_dir = write_case_dir(case_detail, self.output_dir)
+        self.metrics.count('bytes_written', sum(entry.stat().st_size for entry in os.scandir(case_dir)))
+        print(f"案件 {case_detail['case_number']} 的数据已保存到: {case_dir}")
+
+    def save_case_to_blobs(self, case_detail):
+        """保存案件的表格引用，表格按内容只保存一份"""
+        case_dir, written = self.table_store.write_case(case_detail, self.output_dir)
+        self.metrics.count('bytes_written', written)
+        print(f"案件 {case_detail['case_number']} 的数据已保存到: {case_dir}")
+
+    def save_case(self, case_detail, on_saved=None):
+        """按存储方式保存案件，保存完成（数据库事务提交）后调用 on_saved"""
+        with self.metrics.timer('save'):
+            if self.case_exporter:
+                self.metrics.count('bytes_written', self.case_exporter.write(case_detail))
+            if self.case_store:
+                self.case_store.add(case_detail, on_saved)
+                return
+            if self.table_store:
+                self.save_case_to_blobs(case_detail)
+            else:
+                self.save_case_to_files(case_detail)
+        if on_saved:
+            on_saved()
 
-        # 为每个部分创建单独的CSV文件
-        for section_name, tables in case_detail['sections'].items():
-            if tables:
-                for i, table in enumerate(tables):
-                    csv_filename = f"{safe_case_number}_{section_name}"
-                    if len(tables) > 1:
-                        csv_filename += f"_{i + 1}"
-                    csv_filename += ".csv"
+    def flush_storage(self):
+        """写入尚在缓冲区中的案件"""
+        if self.case_store:
+            try:
+                self.case_store.flush()
+            except sqlite3.Error as e:
+                # 这一批案件已记入 case_store.failed_cases，报告中显示为失败
+                print(f"写入数据库时出错: {e}")
+
+    def write_failures(self):
+        """抓取成功但保存失败的案件编号：写入线程出错，或数据库批量写入失败"""
+        failures = set(self._write_failures)
+        if self.case_store:
+            failures |= self.case_store.failed_cases
+        return failures
+
+    def persist_case(self, case_detail, on_saved=None):
+        """保存案件；启用写入线程时放入写入队列"""
+        if self._write_queue is not None:
+            self._write_queue.put((case_detail, on_saved))
+        else:
+            self.save_case(case_detail, on_saved)
 
-                    csv_file = os.path.join(case_dir, csv_filename)
+    def start_writers(self):
+        """启动写入线程"""
+        self._write_failures = set()
+        if not self.writer_threads:
+            return
+        self._write_queue = queue.Queue(maxsize=self.write_queue_size)
+        self._writers = [threading.Thread(target=self._writer_loop, name=f"writer-{i + 1}")
+                         for i in range(self.writer_threads)]
+        for writer in self._writers:
+            writer.start()
+        print(f"使用 {self.writer_threads} 个写入线程保存案件")
+
+    def stop_writers(self):
+        """等待写入队列中的案件全部保存后停止写入线程"""
+        if self._write_queue is None:
+            return
+        for _ in self._writers:
+            self._write_queue.put(None)
+        for writer in self._writers:
+            writer.join()
+        self._write_queue = None
+        self._writers = []
+
+    def _writer_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            case_detail, on_saved = item
+            try:
+                self.save_case(case_detail, on_saved)
+            except Exception as e:
+                print(f"保存案件 {case_detail['case_number']} 时出错: {e}")
+                with self._lock:
+                    self._write_failures.add(case_detail['case_number'])
+
+    def on_case_saved(self, case, index):
+        """案件保存完成后的回调，断点续传版本在这里记录进度"""
+        pass
+
+    def process_case(self, case, index, total):
+        """获取并保存单个案件，成功返回True"""
+        case_number = case.get('案件编号', f'案件_{index}')
+        progress = f"{index}/{total}" if total else f"{index}"
+        print(f"\n[{progress}] 正在处理案件: {case_number}")
+
+        # 获取详情链接
+        detail_links = case.get('详情链接', [])
+        if not detail_links:
+            print(f"案件 {case_number} 没有详情链接，跳过")
+            return False
 
-                    with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerows(table['data'])
+        # 使用第一个详情链接
+        detail_url = detail_links[0]
 
-        # 创建案件摘要文件
-        summary_file = os.path.join(case_dir, f"{safe_case_number}_摘要.txt")
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write(f"案件编号: {case_number}\n")
-            f.write(f"详情页面: {case_detail['url']}\n")
-            f.write(f"数据获取时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        try:
+            # 获取案件详情
+            case_detail = self.get_case_detail(case_number, detail_url)
 
-            f.write("包含的数据部分:\n")
-            for section_name, tables in case_detail['sections'].items():
-                if tables:
-                    f.write(f"- {section_name}: {len(tables)} 个表格\n")
-                    for table in tables:
-                        f.write(f"  * 表格行数: {len(table['data'])}\n")
+            if case_detail:
+                # 添加列表页的基本信息
+                case_detail['basic_info'] = case
 
-        print(f"案件 {case_number} 的数据已保存到: {case_dir}")
+                # 保存到文件或数据库
+                self.persist_case(case_detail, on_saved=lambda: self.on_case_saved(case, index))
+                print(f"案件 {case_number} 处理完成")
+                return True
+            else:
+                print(f"案件 {case_number} 详情获取失败")
+                return False
 
-    def scrape_all_cases(self):
-        """爬取所有案件信息"""
-        if not self.login():
-            print("登录失败，无法继续")
-            return
+        except Exception as e:
+            print(f"处理案件 {case_number} 时出错: {e}")
+            return False
 
-        # 获取案件列表
-        all_cases = self.get_case_list()
-        if not all_cases:
-            print("未找到案件列表")
-            return
+    def scrape_cases(self, cases, total=None):
+        """按顺序或使用线程池处理案件，返回 (成功数, 失败案件编号列表)
 
-        print(f"开始爬取 {len(all_cases)} 个案件的详细信息...")
+        cases 可以是列表，也可以是边翻页边生成案件的迭代器；处理过程中只保留失败的案件。
+        """
+        if total is None and hasattr(cases, '__len__'):
+            total = len(cases)
 
         success_count = 0
-        failed_cases = []
-
-        for i,case in enumerate(all_cases,1):
-            case_number = case.get('案件编号', f'案件_{i}')
-            print(f"\n[{i}/{len(all_cases)}] 正在处理案件: {case_number}")
-
-            # 获取详情链接
-            detail_links = case.get('详情链接', [])
-            if not detail_links:
-                print(f"案件 {case_number} 没有详情链接，跳过")
-                failed_cases.append(case_number)
-                continue
+        failed_jobs = []
+        self.start_parse_pool()
+        self.start_writers()
+        try:
+            with self.profiling(whole_run=True):
+                for job, ok in self.run_jobs((case, i, total) for i, case in enumerate(cases, 1)):
+                    if ok:
+                        success_count += 1
+                    else:
+                        failed_jobs.append(job)
+
+                # 补充重试：第一轮失败且有详情链接的案件再处理一次
+                retry_jobs = [job for job in failed_jobs if job[0].get('详情链接')]
+                if self.deferred_retry and retry_jobs:
+                    print(f"\n对 {len(retry_jobs)} 个失败的案件进行补充重试...")
+                    recovered = {job[1] for job, ok in self.run_jobs(retry_jobs) if ok}
+                    success_count += len(recovered)
+                    failed_jobs = [job for job in failed_jobs if job[1] not in recovered]
+        finally:
+            # 中断时也先写完队列中已解析的案件，再把缓冲区中的案件写入数据库
+            self.stop_writers()
+            self.flush_storage()
+            if self.case_exporter:
+                self.case_exporter.close()
+            self.stop_parse_pool()
+            self.save_run_profile()
+
+        # 失败列表按列表顺序排列；抓取成功但写入线程保存失败的案件也算失败
+        failed_cases = [case.get('案件编号', f'案件_{i}') for case, i, _ in sorted(failed_jobs, key=lambda job: job[1])]
+        write_failures = sorted(self.write_failures() - set(failed_cases))
+        return success_count - len(write_failures), failed_cases + write_failures
+
+    def run_jobs(self, jobs):
+        """按顺序或使用线程池执行 process_case，逐个生成 (job, 是否成功)
+
+        线程池中最多有 2 * max_workers 个案件（执行中或等待执行），列表翻页随处理进度推进，
+        不会一次把所有案件都提交给线程池；使用线程池时按完成顺序生成。
+        """
+        if self.max_workers <= 1:
+            for job in jobs:
+                yield job, self.profiled_process_case(job)
+            return
 
-            # 使用第一个详情链接
-            detail_url = detail_links[0]
+        print(f"使用 {self.max_workers} 个线程并发抓取详情页")
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        running = {}
+        try:
+            for job in jobs:
+                running[executor.submit(self.profiled_process_case, job)] = job
+                if len(running) >= 2 * self.max_workers:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield running.pop(future), future.result()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield running.pop(future), future.result()
+        except KeyboardInterrupt:
+            # 取消尚未开始的案件，正在处理的案件会保存完再退出
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def profiled_process_case(self, job):
+        """执行 process_case，记录成功/失败数，启用 profile 时在当前线程中分析"""
+        with self.profiling():
+            ok = self.process_case(*job)
+        self.metrics.count('cases_saved' if ok else 'cases_failed')
+        return ok
+
+    @contextlib.contextmanager
+    def profiling(self, whole_run=False):
+        """启用 profile 时用 cProfile 分析代码块
+
+        Python 3.12 以下每个抓取线程各用一个分析器（whole_run=False，在线程中调用）；
+        3.12 起整次运行只启用一个分析器（whole_run=True，在 scrape_cases 中调用），分析所有线程。
+        """
+        if not self.profile or whole_run != PROCESS_WIDE_PROFILER:
+            yield
+            return
+        import cProfile
+        profiler = getattr(self._profile_local, 'profiler', None)
+        if profiler is None:
+            profiler = cProfile.Profile()
+            self._profile_local.profiler = profiler
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # 已有其他分析工具（如 python -m cProfile）在运行
+            print(f"无法启用性能分析: {e}")
+            yield
+            return
+        with self._lock:
+            if profiler not in self._profilers:
+                self._profilers.append(profiler)
+        try:
+            yield
+        finally:
+            profiler.disable()
 
-            try:
-                # 获取案件详情
-                case_detail = self.get_case_detail(case_number, detail_url)
+    def run_file(self, name):
+        """本次运行的指标文件路径"""
+        return os.path.join(self.output_dir, name)
 
-                if case_detail:
-                    # 添加列表页的基本信息
-                    case_detail['basic_info'] = case
+    def save_run_profile(self):
+        """把运行指标保存到爬取报告旁边的 运行概况.json，按设置另存 Prometheus 文本和 cProfile 结果"""
+        profile_file = self.run_file("运行概况.json")
+        try:
+            with open(profile_file, 'w', encoding='utf-8') as f:
+                json.dump(self.metrics.snapshot(), f, ensure_ascii=False, indent=2)
+            print(f"运行概况已保存到: {profile_file}")
+
+            if self.metrics_prometheus:
+                with open(self.run_file("运行指标.prom"), 'w', encoding='utf-8') as f:
+                    f.write(self.metrics.to_prometheus())
+
+            if self._profilers:
+                import pstats
+                import io
+                stats = pstats.Stats(self._profilers[0])
+                for profiler in self._profilers[1:]:
+                    stats.add(profiler)
+                stats.dump_stats(self.run_file("运行分析.prof"))
+                text = io.StringIO()
+                stats.stream = text
+                stats.sort_stats('cumulative').print_stats(40)
+                with open(self.run_file("运行分析.txt"), 'w', encoding='utf-8') as f:
+                    f.write(text.getvalue())
+                print(f"性能分析已保存到: {self.run_file('运行分析.prof')}")
+                self._profilers = []
+                self._profile_local = threading.local()
+        except OSError as e:
+            print(f"保存运行概况时出错: {e}")
+
+    def iter_collect(self, cases, case_log):
+        """边迭代边把案件编号记录到 case_log 中，供生成报告使用"""
+        for i, case in enumerate(cases, 1):
+            case_log.add(case.get('案件编号', f'案件_{i}'))
+            yield case
+
+    def open_report_log(self):
+        """记录本次列表中所有案件编号的临时文件"""
+        return ReportLog(os.path.join(self.output_dir, "爬取报告.tmp"))
 
-                    # 保存到文件
-                    self.save_case_to_files(case_detail)
-                    success_count += 1
-                    print(f"案件 {case_number} 处理完成")
-                else:
-                    print(f"案件 {case_number} 详情获取失败")
-                    failed_cases.append(case_number)
+    def scrape_all_cases(self):
+        """爬取所有案件信息"""
+        if not self.login():
+            print("登录失败，无法继续")
+            return
 
-            except Exception as e:
-                print(f"处理案件 {case_number} 时出错: {e}")
-                failed_cases.append(case_number)
+        print("开始爬取案件详细信息（边翻页边抓取详情）...")
 
-                # 添加延时避免请求过快
-            time.sleep(2)
+        # 案件列表逐页获取，每页的案件立即分发给详情线程
+        case_log = self.open_report_log()
+        try:
+            success_count, failed_cases = self.scrape_cases(self.iter_collect(self.iter_case_list(), case_log))
+            if not case_log:
+                print("未找到案件列表")
+                return
 
-        # 生成总结报告
-        self.generate_summary_report(all_cases, success_count, failed_cases)
+            # 生成总结报告
+            self.generate_summary_report(case_log, success_count, failed_cases)
+        finally:
+            case_log.close()
 
         print(f"\n爬取完成！")
+        print(f"共找到 {len(case_log)} 个案件")
         print(f"成功处理: {success_count} 个案件")
         print(f"失败案件: {len(failed_cases)} 个")
         if failed_cases:
             print(f"失败的案件编号: {', '.join(failed_cases)}")
 
-    def generate_summary_report(self, cases_list, success_count, failed_cases):
+    def generate_summary_report(self, case_numbers, success_count, failed_cases, total=None):
+        """写入 爬取报告.txt；case_numbers 为按列表顺序的案件编号，可以是 ReportLog 或迭代器（需给出 total）"""
         report_file = os.path.join(self.output_dir, "爬取报告.txt")
+        if total is None:
+            total = len(case_numbers)
+        failed_set = set(failed_cases)
 
+        # 先写临时文件再替换：多个 worker 同时生成报告时，不会交错写入同一个文件
+        tmp_file = f"{report_file}.{os.getpid()}.tmp"
         try:
-            with open(report_file, 'w', encoding='utf-8') as f:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 f.write("案件数据爬取报告\n")
                 f.write("=" * 50 + "\n\n")
                 f.write(f"爬取时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"总案件数: {len(cases_list)}\n")
+                f.write(f"总案件数: {total}\n")
                 f.write(f"成功爬取: {success_count}\n")
                 f.write(f"失败案件: {len(failed_cases)}\n\n")
 
@@ -430,10 +2261,10 @@ class ZMJGCaseScraper:
 
                 f.write("所有案件概览:\n")
                 f.write("-" * 30 + "\n")
-                for i, case in enumerate(cases_list, 1):
-                    case_number = case.get('案件编号', f'案件_{i}')
-                    status = "✓ 成功" if case_number not in failed_cases else "✗ 失败"
+                for i, case_number in enumerate(case_numbers, 1):
+                    status = "✓ 成功" if case_number not in failed_set else "✗ 失败"
                     f.write(f"{i:3d}. {case_number} - {status}\n")
+            os.replace(tmp_file, report_file)
 
             print(f"爬取报告已保存到: {report_file}")
 
@@ -443,7 +2274,7 @@ class ZMJGCaseScraper:
     def test_connection(self):
         """测试网站连接"""
         print("测试网站连接...")
-        soup = self.get_page(self.base_url)
+        soup = self.get_page(self.base_url, parser=self.soup_parser)
         if soup:
             print("网站连接正常")
             print(f"页面标题: {soup.title.string if soup.title else '无标题'}")
@@ -453,28 +2284,59 @@ class ZMJGCaseScraper:
             return False
 
 
+# 不参与默认指纹的列：序号随列表中新增的案件整体移动，操作列只有按钮，空表头多为勾选框
+FINGERPRINT_EXCLUDED_FIELDS = ('详情链接', '序号', '行号', '操作', '选择', '')
+
+
 # 高级功能：支持断点续传
 class AdvancedZMJGScraper(ZMJGCaseScraper):
-    def __init__(self, username, password):
-        super().__init__(username, password)
-        self.progress_file = os.path.join(self.output_dir, "爬取进度.json")
-        self.completed_cases = self.load_progress()
+    def __init__(self, username, password, incremental=False, fingerprint_fields=None, **kwargs):
+        super().__init__(username, password, **kwargs)
+        self.progress_file = os.path.join(self.output_dir, "爬取进度.db")
+        self.progress_store = ProgressStore(self.progress_file,
+                                            legacy_file=os.path.join(self.output_dir, "爬取进度.json"))
+        # 增量模式：已完成的案件只有在列表行的指纹变化时才重新爬取
+        self.incremental = incremental
+        # 参与指纹计算的列（如 '录入时间'、'结案时间'），为空时使用除序号、操作等以外的所有单元格
+        self.fingerprint_fields = fingerprint_fields
+        # 已完成的案件编号 -> 完成时列表行的指纹；按需查询数据库，不把全部进度读入内存
+        self.completed_cases = self.progress_store
 
     def load_progress(self):
         """加载爬取进度"""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return set(json.load(f))
-            except:
-                return set()
-        return set()
-
-    def save_progress(self, case_number):
-        """保存爬取进度"""
-        self.completed_cases.add(case_number)
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(list(self.completed_cases), f, ensure_ascii=False, indent=2)
+        return self.progress_store.load()
+
+    def save_progress(self, case_number, fingerprint=None):
+        """保存爬取进度，每个案件只写入一条记录"""
+        self.progress_store.commit(case_number, fingerprint)
+
+    def case_fingerprint(self, case):
+        """案件列表行的指纹，行内容变化说明案件有更新"""
+        fields = [field for field in (self.fingerprint_fields or []) if field in case]
+        if not fields:
+            fields = sorted(key for key in case if key not in FINGERPRINT_EXCLUDED_FIELDS)
+        content = json.dumps([[field, case.get(field, '')] for field in fields], ensure_ascii=False)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def on_case_saved(self, case, index):
+        """案件保存后立即记录进度"""
+        self.save_progress(case.get('案件编号', f'案件_{index}'), self.case_fingerprint(case))
+
+    def get_remaining_cases(self, all_cases):
+        """过滤已完成的案件"""
+        return list(self.iter_remaining_cases(all_cases))
+
+    def iter_remaining_cases(self, cases):
+        """逐个过滤已完成的案件，增量模式下保留列表信息有变化的案件"""
+        for case in cases:
+            case_number = case.get('案件编号', '')
+            if case_number not in self.completed_cases:
+                yield case
+            elif self.incremental and self.completed_cases[case_number] != self.case_fingerprint(case):
+                print(f"案件 {case_number} 列表信息有变化，重新爬取")
+                yield case
+            else:
+                print(f"案件 {case_number} 已完成，跳过")
 
     def scrape_all_cases(self):
         """支持断点续传的爬取"""
@@ -482,63 +2344,511 @@ class AdvancedZMJGScraper(ZMJGCaseScraper):
             print("登录失败，无法继续")
             return
 
-        all_cases = self.get_case_list()
-        if not all_cases:
-            print("未找到案件列表")
+        case_log = self.open_report_log()
+        try:
+            remaining_cases = self.iter_remaining_cases(self.iter_collect(self.iter_case_list(), case_log))
+            try:
+                success_count, failed_cases = self.scrape_cases(remaining_cases)
+            finally:
+                self.progress_store.compact()
+            if not case_log:
+                print("未找到案件列表")
+                return
+
+            if not success_count and not failed_cases:
+                print("所有案件都已完成爬取")
+                return
+
+            print(f"本次爬取 {success_count + len(failed_cases)} 个案件（总共 {len(case_log)} 个）")
+            self.generate_summary_report(case_log, success_count, failed_cases)
+        finally:
+            case_log.close()
+        print(f"\n爬取完成！成功: {success_count}, 失败: {len(failed_cases)}")
+
+
+# 分布式模式：多个进程或机器共享 爬取队列.db 中的案件
+class DistributedZMJGScraper(AdvancedZMJGScraper):
+    def __init__(self, username, password, frontier_file=None, worker_id=None, lease_seconds=300,
+                 max_attempts=3, poll_interval=2.0, reseed=False, **kwargs):
+        export_ndjson = kwargs.pop('export_ndjson', None)
+        export_rotate_mb = kwargs.pop('export_rotate_mb', 256)
+        super().__init__(username, password, **kwargs)
+        self.frontier_file = frontier_file or os.path.join(self.output_dir, "爬取队列.db")
+        self.frontier = CaseFrontier(self.frontier_file, lease_seconds=lease_seconds, max_attempts=max_attempts)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        # 用在文件名中的 worker 标识
+        self.worker_tag = re.sub(r'[^\w.-]', '_', self.worker_id)
+        self.poll_interval = poll_interval
+        self.reseed = reseed
+        # 失败的案件放回共享队列，由任意 worker 重新领取，不再单独补充重试
+        self.deferred_retry = False
+        # 同时领取的案件不超过抓取线程数，其余案件留给其他 worker
+        self._slots = threading.Semaphore(self.max_workers)
+        self._seeder = None
+        self._seed_attempts = 0
+        self._stop_heartbeat = threading.Event()
+        self._released_failures = set()
+        # 各 worker 导出到自己的文件，共用输出目录时不会同时追加同一个文件
+        if export_ndjson:
+            self.case_exporter = CaseExporter(os.path.join(self.output_dir, "导出"), compression=export_ndjson,
+                                              rotate_mb=export_rotate_mb,
+                                              prefix="案件导出-" + self.worker_tag)
+
+    def run_file(self, name):
+        """各 worker 的运行指标分别保存，如 运行概况-<worker>.json"""
+        stem, ext = os.path.splitext(name)
+        return os.path.join(self.output_dir, f"{stem}-{self.worker_tag}{ext}")
+
+    def on_case_saved(self, case, index):
+        """案件保存后记录进度，并在共享队列中标记为完成"""
+        super().on_case_saved(case, index)
+        self.frontier.complete(case.get('案件编号', f'案件_{index}'))
+
+    def save_case(self, case_detail, on_saved=None):
+        try:
+            super().save_case(case_detail, on_saved)
+        except Exception:
+            # 保存失败的案件放回队列
+            self.frontier.fail(case_detail['case_number'], self.worker_id)
+            self.release_failed_writes()
+            raise
+
+    def flush_storage(self):
+        super().flush_storage()
+        self.release_failed_writes()
+
+    def release_failed_writes(self):
+        """数据库批量写入失败的案件放回队列，否则本 worker 一直为它们续约"""
+        if not self.case_store:
             return
+        with self._lock:
+            failed = self.case_store.failed_cases - self._released_failures
+            self._released_failures |= failed
+        for case_number in failed:
+            self.frontier.fail(case_number, self.worker_id)
 
-        # 过滤已完成的案件
-        remaining_cases = []
-        for case in all_cases:
-            case_number = case.get('案件编号', '')
-            if case_number not in self.completed_cases:
-                remaining_cases.append(case)
-            else:
-                print(f"案件 {case_number} 已完成，跳过")
+    def process_case(self, case, index, total):
+        try:
+            ok = super().process_case(case, index, total)
+        finally:
+            self._slots.release()
+        if not ok:
+            self.frontier.fail(case.get('案件编号', f'案件_{index}'), self.worker_id)
+        return ok
+
+    def seed_frontier(self):
+        """翻页获取案件列表，每页写入共享队列"""
+        done = False
+        try:
+            entries = []
+            for case in self.iter_case_list():
+                case_number = case.get('案件编号', '')
+                fingerprint = self.case_fingerprint(case)
+                completed = case_number in self.completed_cases and not (
+                    self.incremental and self.completed_cases[case_number] != fingerprint)
+                entries.append((case, fingerprint, completed))
+                if len(entries) >= 50:
+                    self.frontier.add(entries, refresh=self.incremental)
+                    entries = []
+            self.frontier.add(entries, refresh=self.incremental)
+            done = True
+        except Exception as e:
+            print(f"获取案件列表时出错: {e}")
+        finally:
+            self.frontier.release_seed(self.worker_id, done)
+
+    def heartbeat_loop(self):
+        """定时为本 worker 的租约续期"""
+        interval = max(1.0, self.frontier.lease_seconds / 3)
+        while not self._stop_heartbeat.wait(interval):
+            try:
+                self.frontier.heartbeat(self.worker_id)
+            except sqlite3.Error as e:
+                print(f"续约失败: {e}")
+
+    def iter_claimed_cases(self):
+        """从共享队列逐个领取案件，直到所有案件都处理完"""
+        while True:
+            self._slots.acquire()
+            claimed = self.frontier.claim(self.worker_id)
+            if claimed:
+                yield claimed[0]
+                continue
+            self._slots.release()
+
+            if self.frontier.finished():
+                return
+            # 没有 worker 在写入列表（或写入的 worker 已崩溃）时由本 worker 接手
+            if (self._seeder is None or not self._seeder.is_alive()) and not self.frontier.seeded():
+                if self._seed_attempts >= 3:
+                    print("多次获取案件列表失败，停止领取新案件")
+                    return
+                if self.frontier.claim_seed(self.worker_id):
+                    self._seed_attempts += 1
+                    print("本 worker 负责翻页获取案件列表")
+                    self._seeder = threading.Thread(target=self.seed_frontier, name="seeder", daemon=True)
+                    self._seeder.start()
+                    continue
+            # 缓冲区中的案件写入后才算完成，等待期间先写入
+            self.flush_storage()
+            time.sleep(self.poll_interval)
 
-        if not remaining_cases:
-            print("所有案件都已完成爬取")
+    def scrape_all_cases(self):
+        """领取共享队列中的案件并处理，可在多个进程或机器上同时运行"""
+        if not self.login():
+            print("登录失败，无法继续")
             return
 
-        print(f"需要爬取 {len(remaining_cases)} 个案件（总共 {len(all_cases)} 个）")
+        if self.reseed:
+            self.frontier.reset_seed()
+        print(f"worker {self.worker_id} 使用共享队列: {self.frontier_file}")
 
-        success_count = 0
-        failed_cases = []
+        self._stop_heartbeat.clear()
+        heartbeat = threading.Thread(target=self.heartbeat_loop, name="heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            success_count, failed_cases = self.scrape_cases(self.iter_claimed_cases())
+        finally:
+            self._stop_heartbeat.set()
+            heartbeat.join()
+            self.progress_store.compact()
+
+        counts = self.frontier.counts()
+        print(f"本 worker 处理 {success_count + len(failed_cases)} 个案件，成功 {success_count}；"
+              f"队列中完成 {counts.get('done', 0)} 个，失败 {counts.get('failed', 0)} 个")
+
+        # 报告按共享队列的最终状态生成，各 worker 生成的报告相同
+        total = sum(counts.values())
+        if not total:
+            print("未找到案件列表")
+            return
+        failed = [case_number for case_number, state in self.frontier.iter_states() if state != 'done']
+        self.generate_summary_report((case_number for case_number, _ in self.frontier.iter_states()),
+                                     total - len(failed), failed, total=total)
+        print(f"\n爬取完成！成功: {total - len(failed)}, 失败: {len(failed)}")
+
+
+# 异步模式：详情页通过 asyncio + aiohttp 并发获取
+class AsyncZMJGScraper(AdvancedZMJGScraper):
+    def __init__(self, username, password, concurrency=100, **kwargs):
+        super().__init__(username, password, **kwargs)
+        # 同时在途的详情页请求数
+        self.concurrency = max(1, int(concurrency))
+        self._semaphore = None
+
+    def parse_body(self, html):
+        """解析页面，在线程池中执行"""
+        with self.metrics.timer('parse'):
+            return parse_html(html, self.parser)
+
+    def copy_cookies(self, client):
+        """把同步会话的 Cookie 复制到 aiohttp 会话"""
+        from yarl import URL
+        for cookie in self.session.cookies:
+            client.cookie_jar.update_cookies({cookie.name: cookie.value}, response_url=URL(self.base_url))
+
+    async def async_get_page(self, client, url, data=None, method='GET'):
+        """异步获取页面内容"""
+        fetched = await self.async_fetch(client, url, data, method)
+        if fetched is None:
+            return None
+        html, _ = fetched
+        # 解析是CPU密集操作，放到线程池避免阻塞事件循环
+        return await asyncio.to_thread(self.parse_body, html)
+
+    async def async_fetch(self, client, url, data=None, method='GET', relogin=True):
+        """异步获取页面，返回 (页面文本, 编码)，会话过期时重新登录并重试一次"""
+        import aiohttp
+        if self.cache_mode == 'offline':
+            # 离线模式只读本地缓存，直接复用同步实现
+            html = await asyncio.to_thread(self.fetch_html, url, data, method)
+            return None if html is None else (html, None)
+
+        generation = self._session_generation
+        key = entry = None
+        headers = {}
+        if self.cache:
+            key = self.cache.make_key(method, url, data)
+            entry = await asyncio.to_thread(self.cache.get, key)
+            # 条件请求：页面未变化时服务器返回304，不再传输页面内容
+            if entry:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            wait = self.circuit_breaker.wait_time()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self.circuit_breaker.wait_time()
+            wait_start = time.monotonic()
+            wait = self.rate_limiter.try_acquire(url)
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self.rate_limiter.try_acquire(url)
+            self.metrics.observe('rate_limit_wait', time.monotonic() - wait_start)
+
+            retry_after = None
+            try:
+                print(f"正在访问: {url}")
+                start = time.monotonic()
+                async with client.request(method.upper(), url, data=data, headers=headers) as response:
+                    self.rate_limiter.record(url, time.monotonic() - start, response.status)
+                    if response.status in policy.retry_statuses:
+                        self.metrics.observe('request', time.monotonic() - start)
+                        self.metrics.count('http_retryable_errors')
+                        error = f"HTTP {response.status}"
+                        retry_after = response.headers.get('Retry-After')
+                    else:
+                        response.raise_for_status()
+                        body = await response.read()
+                        self.metrics.observe('request', time.monotonic() - start)
+                        content_type = response.headers.get('Content-Type')
+                        final_url = str(response.url)
+                        redirected = bool(response.history)
+                        etag = response.headers.get('ETag')
+                        last_modified = response.headers.get('Last-Modified')
+                        not_modified = entry is not None and response.status == 304
+                        self.circuit_breaker.record_success()
+                        break
+            except aiohttp.ClientResponseError as e:
+                # 非重试类的错误状态码
+                self.circuit_breaker.record_success()
+                print(f"请求失败: {e}")
+                self.metrics.count('http_errors')
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.rate_limiter.record(url, error=True)
+                self.metrics.count('request_errors')
+                error = str(e) or "请求超时"
+
+            self.circuit_breaker.record_failure()
+            if attempt >= policy.max_retries or not policy.take_budget():
+                print(f"请求失败: {error}")
+                self.metrics.count('failed_requests')
+                return None
+
+            delay = policy.backoff(attempt, retry_after)
+            attempt += 1
+            print(f"请求失败: {error}，{delay:.1f} 秒后第 {attempt} 次重试")
+            self.metrics.count('retries')
+            await asyncio.sleep(delay)
+
+        if not_modified:
+            print(f"页面未变化，使用缓存: {url}")
+            self.metrics.count('not_modified')
+            return entry['body'].decode(entry['encoding'], errors='replace'), entry['encoding']
+
+        # 登录表单的特征都是ASCII字符，按 latin-1 解码即可检测，不必先识别编码
+        if self.session_expired(final_url, redirected, body.decode('latin-1')):
+            self.metrics.count('session_expired')
+            if relogin and await asyncio.to_thread(self.relogin, generation):
+                self.copy_cookies(client)
+                return await self.async_fetch(client, url, data, method, relogin=False)
+            print(f"会话已失效，无法获取: {url}")
+            return None
+
+        # 按声明的编码或该主机已知的编码解码，放到线程中避免阻塞事件循环
+        html, encoding = await asyncio.to_thread(self.decode_response, final_url, content_type, body)
+        if self.cache:
+            await asyncio.to_thread(self.cache.put, key, url, body, encoding,
+                                    etag=etag, last_modified=last_modified)
+        return html, encoding
+
+    async def async_get_case_detail(self, client, case_number, detail_url):
+        """异步获取案件详情"""
+        print(f"正在获取案件 {case_number} 的详情...")
+
+        if self._parse_pool:
+            # 页面文本交给解析进程解析
+            fetched = await self.async_fetch(client, detail_url)
+            if fetched is None:
+                return None
+            html, _ = fetched
+            with self.metrics.timer('parse_process'):
+                case_detail, snapshot = await asyncio.get_running_loop().run_in_executor(
+                    self._parse_pool, parse_case_detail_page, case_number, detail_url, html, self.parser, True)
+            self.metrics.merge(snapshot)
+            return case_detail
+
+        soup = await self.async_get_page(client, detail_url)
+        if not soup:
+            return None
 
-        for i, case in enumerate(remaining_cases, 1):
-            case_number = case.get('案件编号', f'案件_{i}')
-            print(f"\n[{i}/{len(remaining_cases)}] 正在处理案件: {case_number}")
+        try:
+            return await asyncio.to_thread(self.parse_case_detail, case_number, detail_url, soup)
+        finally:
+            release_html(soup)
+
+    async def async_process_case(self, client, case, index, total):
+        """异步处理单个案件，成功返回True"""
+        case_number = case.get('案件编号', f'案件_{index}')
+
+        async with self._semaphore:
+            progress = f"{index}/{total}" if total else f"{index}"
+            print(f"\n[{progress}] 正在处理案件: {case_number}")
 
             detail_links = case.get('详情链接', [])
             if not detail_links:
                 print(f"案件 {case_number} 没有详情链接，跳过")
-                failed_cases.append(case_number)
-                continue
+                return False
 
             try:
-                case_detail = self.get_case_detail(case_number, detail_links[0])
+                case_detail = await self.async_get_case_detail(client, case_number, detail_links[0])
 
                 if case_detail:
                     case_detail['basic_info'] = case
-                    self.save_case_to_files(case_detail)
-                    self.save_progress(case_number)  # 保存进度
-                    success_count += 1
+                    await asyncio.to_thread(self.persist_case, case_detail, lambda: self.on_case_saved(case, index))
                     print(f"案件 {case_number} 处理完成")
+                    self.metrics.count('cases_saved')
+                    return True
                 else:
-                    failed_cases.append(case_number)
+                    print(f"案件 {case_number} 详情获取失败")
+                    self.metrics.count('cases_failed')
+                    return False
 
             except Exception as e:
                 print(f"处理案件 {case_number} 时出错: {e}")
-                failed_cases.append(case_number)
+                self.metrics.count('cases_failed')
+                return False
+
+    async def run_async_jobs(self, client, jobs, total=None):
+        """用 concurrency 个协程处理 (案件, 序号)，返回 (成功数, 失败的 (案件, 序号) 列表)
+
+        案件经有界队列交给各协程，jobs 可以是边翻页边生成的迭代器，队列满时暂停翻页。
+        """
+        pending = asyncio.Queue(maxsize=self.concurrency)
+        failed_jobs = []
+        success_count = 0
+
+        async def produce():
+            iterator = iter(jobs)
+            while True:
+                # 翻页要请求网络，在线程中取下一个案件
+                job = await asyncio.to_thread(next, iterator, None)
+                if job is None:
+                    break
+                await pending.put(job)
+            for _ in range(self.concurrency):
+                await pending.put(None)
+
+        async def consume():
+            nonlocal success_count
+            while True:
+                job = await pending.get()
+                if job is None:
+                    return
+                if await self.async_process_case(client, job[0], job[1], total):
+                    success_count += 1
+                else:
+                    failed_jobs.append(job)
+
+        await asyncio.gather(produce(), *(consume() for _ in range(self.concurrency)))
+        return success_count, failed_jobs
+
+    async def scrape_cases_async(self, cases):
+        """并发处理案件，返回 (成功数, 失败案件编号列表)；cases 可以是列表或迭代器"""
+        import aiohttp
 
-            time.sleep(2)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=15)
+        total = len(cases) if hasattr(cases, '__len__') else None
+
+        # 沿用同步会话的请求头和登录后的 Cookie；unsafe=True 允许内网用IP地址访问时也保存 Cookie
+        async with aiohttp.ClientSession(headers=dict(self.session.headers), connector=connector,
+                                         timeout=timeout, cookie_jar=aiohttp.CookieJar(unsafe=True)) as client:
+            self.copy_cookies(client)
+
+            print(f"使用异步模式抓取详情页，最大并发 {self.concurrency}")
+            self.start_parse_pool()
+            self.start_writers()
+            try:
+                # 启用 profile 时分析事件循环线程，协程都在这个线程中运行（3.12 起分析所有线程）
+                with self.profiling(whole_run=True), self.profiling():
+                    success_count, failed_jobs = await self.run_async_jobs(
+                        client, ((case, i) for i, case in enumerate(cases, 1)), total)
+
+                    # 补充重试：第一轮失败且有详情链接的案件再处理一次
+                    retry_jobs = [job for job in failed_jobs if job[0].get('详情链接')]
+                    if self.deferred_retry and retry_jobs:
+                        print(f"\n对 {len(retry_jobs)} 个失败的案件进行补充重试...")
+                        recovered, still_failed = await self.run_async_jobs(client, retry_jobs, total)
+                        success_count += recovered
+                        retried = {index for _, index in retry_jobs}
+                        failed_jobs = [job for job in failed_jobs if job[1] not in retried] + still_failed
+            finally:
+                await asyncio.to_thread(self.stop_writers)
+                await asyncio.to_thread(self.flush_storage)
+                if self.case_exporter:
+                    self.case_exporter.close()
+                await asyncio.to_thread(self.stop_parse_pool)
+                self.save_run_profile()
+
+        failed_cases = [case.get('案件编号', f'案件_{i}') for case, i in sorted(failed_jobs, key=lambda job: job[1])]
+        write_failures = sorted(self.write_failures() - set(failed_cases))
+        return success_count - len(write_failures), failed_cases + write_failures
+
+    def scrape_cases(self, cases, total=None):
+        """同步入口，在新的事件循环中运行异步抓取"""
+        return asyncio.run(self.scrape_cases_async(cases))
+
+    async def scrape_all_cases_async(self):
+        """异步版本的断点续传爬取，边翻页边抓取详情页"""
+        # 登录和列表页只请求少数几次，直接放到线程中执行同步方法
+        if not await asyncio.to_thread(self.login):
+            print("登录失败，无法继续")
+            return
 
-        self.generate_summary_report(all_cases, success_count, failed_cases)
+        case_log = self.open_report_log()
+        try:
+            remaining_cases = self.iter_remaining_cases(self.iter_collect(self.iter_case_list(), case_log))
+            try:
+                success_count, failed_cases = await self.scrape_cases_async(remaining_cases)
+            finally:
+                self.progress_store.compact()
+            if not case_log:
+                print("未找到案件列表")
+                return
+
+            if not success_count and not failed_cases:
+                print("所有案件都已完成爬取")
+                return
+
+            print(f"本次爬取 {success_count + len(failed_cases)} 个案件（总共 {len(case_log)} 个）")
+            self.generate_summary_report(case_log, success_count, failed_cases)
+        finally:
+            case_log.close()
         print(f"\n爬取完成！成功: {success_count}, 失败: {len(failed_cases)}")
 
 
+def export_cases(output_dir="案件数据", case_numbers=None):
+    """把 案件数据.db 或 表格/ 中的案件导出为原来的 <案件编号>/ 文件夹结构"""
+    db_file = os.path.join(output_dir, "案件数据.db")
+    blob_dir = os.path.join(output_dir, "表格")
+    if os.path.exists(db_file):
+        store = CaseStore(db_file)
+    elif os.path.isdir(blob_dir):
+        store = TableBlobStore(blob_dir)
+    else:
+        print(f"未找到 {db_file} 或 {blob_dir}")
+        return 0
+
+    count = store.export_case_dirs(output_dir, case_numbers)
+    print(f"已导出 {count} 个案件到 {output_dir}")
+    return count
+
+
 def main():
     """主函数"""
+    # python ZMJGCaseScraper.py export [案件编号 ...]
+    if len(sys.argv) > 1 and sys.argv[1] == 'export':
+        export_cases(case_numbers=sys.argv[2:] or None)
+        return
+
     print("ZMJG案件信息爬虫")
     print("=" * 50)
 
@@ -554,15 +2864,75 @@ def main():
     print("\n请选择爬虫模式:")
     print("1. 基础模式 (一次性爬取所有案件)")
     print("2. 高级模式 (支持断点续传)")
+    print("3. 异步模式 (支持断点续传，需要安装 aiohttp)")
+    print("4. 分布式模式 (多个进程或机器共享案件队列，支持断点续传)")
+
+    mode = input("请选择模式 (1/2/3/4): ").strip()
+
+    parser = input(f"请选择解析后端 ({'/'.join(PARSER_BACKENDS)}，默认html.parser): ").strip() or 'html.parser'
+    if parser not in PARSER_BACKENDS:
+        print(f"不支持的解析后端 {parser}，使用 html.parser")
+        parser = 'html.parser'
+
+    print("\n网页缓存: 0. 不使用  1. 使用并向服务器确认页面是否变化  2. 离线模式 (只使用缓存)")
+    cache_choice = input("请选择缓存方式 (0/1/2，默认0): ").strip()
+    cache_mode = {'1': 'revalidate', '2': 'offline'}.get(cache_choice)
+
+    print("\n案件保存方式: 1. 每个案件一个文件夹  2. SQLite 数据库 (批量写入，可用 export 命令导出为文件夹)  "
+          "3. 表格去重 (相同表格只保存一份，可用 export 命令导出为文件夹)")
+    storage = {'2': 'sqlite', '3': 'blobs'}.get(input("请选择保存方式 (1/2/3，默认1): ").strip(), 'files')
+    export_choice = input("是否同时把案件流式导出为压缩 NDJSON (导出/案件导出-*.ndjson.gz) (y/N): ").strip().lower()
+    export_ndjson = 'gzip' if export_choice == 'y' else None
+
+    incremental = False
+    fingerprint_fields = None
+    if mode in ("2", "3", "4"):
+        incremental = input("是否使用增量模式，只重新爬取列表信息有变化的案件 (y/N): ").strip().lower() == 'y'
+    if incremental:
+        fields = input("请输入判断案件是否变化的列，用逗号分隔 (如 录入时间,结案时间；默认除序号、操作外的所有列): ")
+        fingerprint_fields = [field.strip() for field in fields.replace('，', ',').split(',') if field.strip()] or None
+
+    max_workers = 1
+    if mode != "3":
+        workers = input("请输入并发线程数 (默认1): ").strip()
+        max_workers = int(workers) if workers.isdigit() and int(workers) > 0 else 1
+
+    writers = input("请输入写入线程数 (默认0，抓取线程直接保存): ").strip()
+    writer_threads = int(writers) if writers.isdigit() else 0
 
-    mode = input("请选择模式 (1/2): ").strip()
+    processes = input("请输入解析进程数 (默认0，在抓取线程中解析): ").strip()
+    parse_processes = int(processes) if processes.isdigit() else 0
 
     # 创建爬虫实例
-    if mode == "2":
-        scraper = AdvancedZMJGScraper(username, password)
+    if mode == "3":
+        concurrency = input("请输入最大并发请求数 (默认100): ").strip()
+        concurrency = int(concurrency) if concurrency.isdigit() and int(concurrency) > 0 else 100
+        scraper = AsyncZMJGScraper(username, password, concurrency=concurrency, parser=parser,
+                                   cache_mode=cache_mode, incremental=incremental,
+                                   fingerprint_fields=fingerprint_fields, storage=storage,
+                                   writer_threads=writer_threads, parse_processes=parse_processes,
+                                   export_ndjson=export_ndjson)
+        print("使用异步模式 (支持断点续传)")
+    elif mode == "4":
+        frontier_file = input("请输入共享队列文件路径 (默认 案件数据/爬取队列.db，多台机器时放在共享目录): ").strip()
+        reseed = input("是否重新翻页获取案件列表，开始新一轮爬取 (y/N): ").strip().lower() == 'y'
+        scraper = DistributedZMJGScraper(username, password, frontier_file=frontier_file or None, reseed=reseed,
+                                         max_workers=max_workers, parser=parser, cache_mode=cache_mode,
+                                         incremental=incremental, fingerprint_fields=fingerprint_fields,
+                                         storage=storage, writer_threads=writer_threads,
+                                         parse_processes=parse_processes, export_ndjson=export_ndjson)
+        print(f"使用分布式模式，worker {scraper.worker_id}")
+    elif mode == "2":
+        scraper = AdvancedZMJGScraper(username, password, max_workers=max_workers, parser=parser,
+                                      cache_mode=cache_mode, incremental=incremental,
+                                      fingerprint_fields=fingerprint_fields, storage=storage,
+                                      writer_threads=writer_threads, parse_processes=parse_processes,
+                                      export_ndjson=export_ndjson)
         print("使用高级模式 (支持断点续传)")
     else:
-        scraper = ZMJGCaseScraper(username, password)
+        scraper = ZMJGCaseScraper(username, password, max_workers=max_workers, parser=parser,
+                                  cache_mode=cache_mode, storage=storage, writer_threads=writer_threads,
+                                  parse_processes=parse_processes, export_ndjson=export_ndjson)
         print("使用基础模式")
 
     # 测试连接
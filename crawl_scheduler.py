@@ -0,0 +1,245 @@
+"""多站点爬取调度
+
+在一个进程中同时运行 ZMJG、Jeecg 和 Gouguoa 的爬取。各站点的会话挂载同一个
+HTTPAdapter，共用连接池；每个站点按自己的速率上限发送请求，一个站点等待网络
+响应时其他站点继续工作。
+
+用法：python crawl_scheduler.py
+"""
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ZMJGCaseScraper import AdaptiveRateLimiter
+
+
+class PoliteAdapter(HTTPAdapter):
+    """所有站点共用的 HTTPAdapter
+
+    发送请求前按主机限速，收到响应后把延迟和状态码反馈给限速器。
+    exempt_hosts 中的主机由爬虫自己限速（ZMJG 的 send_request），这里不再重复等待。
+    """
+
+    def __init__(self, rate_limiter, pool_connections=10, pool_maxsize=10):
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.rate_limiter = rate_limiter
+        self.exempt_hosts = set()
+
+    def send(self, request, **kwargs):
+        if urlparse(request.url).netloc in self.exempt_hosts:
+            return super().send(request, **kwargs)
+
+        self.rate_limiter.acquire(request.url)
+        start = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException:
+            self.rate_limiter.record(request.url, error=True)
+            raise
+        self.rate_limiter.record(request.url, time.monotonic() - start, response.status_code)
+        return response
+
+
+class SiteAdapter:
+    """站点适配器：调度器通过它登录和运行一个站点的爬取
+
+    子类需要设置 name、session、base_url，并实现 crawl()。
+    max_rate 为该站点每秒最多请求数，max_workers 为该站点同时进行的请求数。
+    """
+    name = "site"
+    max_rate = 2.0
+    max_workers = 4
+    # 爬虫自己经过限速器发送请求时为True
+    self_limited = False
+
+    @property
+    def host(self):
+        return urlparse(self.base_url).netloc
+
+    def use_rate_limiter(self, rate_limiter):
+        """self_limited 的站点在这里换成调度器的限速器"""
+
+    def login(self):
+        """登录，需要输入验证码的站点在开始并发爬取前依次完成，返回是否成功"""
+        return True
+
+    def crawl(self):
+        raise NotImplementedError
+
+
+class ZMJGSite(SiteAdapter):
+    """ZMJG 案件爬取，登录在 scrape_all_cases 中完成"""
+    name = "ZMJG"
+    self_limited = True
+
+    def __init__(self, scraper, max_rate=2.0):
+        self.scraper = scraper
+        self.session = scraper.session
+        self.base_url = scraper.base_url
+        self.max_rate = max_rate
+        self.max_workers = scraper.max_workers
+
+    def use_rate_limiter(self, rate_limiter):
+        self.scraper.rate_limiter = rate_limiter
+
+    def crawl(self):
+        self.scraper.scrape_all_cases()
+
+
+class JeecgSite(SiteAdapter):
+    """Jeecg 我的任务，登录需要输入验证码"""
+    name = "Jeecg"
+
+    def __init__(self, crawler, username, password, max_rate=5.0):
+        self.crawler = crawler
+        self.session = crawler.session
+        self.base_url = crawler.base_url
+        self.username = username
+        self.password = password
+        self.max_rate = max_rate
+        self.max_workers = crawler.max_workers
+
+    def login(self):
+        check_key = self.crawler.get_captcha()
+        if not check_key:
+            return False
+        captcha = input("请输入 Jeecg 验证码: ")
+        return self.crawler.login(self.username, self.password, captcha, check_key)
+
+    def crawl(self):
+        self.crawler.get_my_tasks()
+
+
+class GouguoaSite(SiteAdapter):
+    """Gouguoa 公文列表，已提供 PHPSESSID 时跳过验证码登录"""
+    name = "Gouguoa"
+
+    def __init__(self, crawler, username=None, password=None, max_rate=5.0):
+        self.crawler = crawler
+        self.session = crawler.session
+        self.base_url = crawler.base_url
+        self.username = username
+        self.password = password
+        self.max_rate = max_rate
+        self.max_workers = crawler.max_workers
+
+    def login(self):
+        if self.session.cookies.get("PHPSESSID"):
+            return True
+        if not self.crawler.get_captcha():
+            return False
+        captcha = input("请输入 Gouguoa 验证码: ")
+        return self.crawler.login(self.username, self.password, captcha)
+
+    def crawl(self):
+        self.crawler.get_documents()
+
+
+class CrawlScheduler:
+    """在一个进程中并发运行多个站点的爬取，共用连接池，按站点限速"""
+
+    def __init__(self, rate_limiter=None):
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.sites = []
+
+    def add(self, site):
+        self.sites.append(site)
+        return site
+
+    def mount(self):
+        """把同一个 PoliteAdapter 挂载到所有站点的会话，并设置各站点的速率上限"""
+        pool_maxsize = max([10] + [site.max_workers for site in self.sites])
+        adapter = PoliteAdapter(self.rate_limiter, pool_connections=max(10, len(self.sites) * 2),
+                                pool_maxsize=pool_maxsize)
+        for site in self.sites:
+            self.rate_limiter.host_limits[site.host] = (self.rate_limiter.min_rate, site.max_rate)
+            if site.self_limited:
+                adapter.exempt_hosts.add(site.host)
+                site.use_rate_limiter(self.rate_limiter)
+            site.session.mount("http://", adapter)
+            site.session.mount("https://", adapter)
+        return adapter
+
+    def run_site(self, site):
+        """运行一个站点的爬取，返回 (站点名, 是否成功, 耗时)"""
+        start = time.time()
+        try:
+            site.crawl()
+            ok = True
+        except Exception as e:
+            print(f"[{site.name}] 爬取出错: {e}")
+            traceback.print_exc()
+            ok = False
+        return site.name, ok, time.time() - start
+
+    def run(self):
+        """依次登录各站点，然后同时运行所有站点的爬取，返回各站点的结果"""
+        self.mount()
+
+        ready = []
+        for site in self.sites:
+            print(f"[{site.name}] 正在登录...")
+            if site.login():
+                ready.append(site)
+            else:
+                print(f"[{site.name}] 登录失败，跳过")
+
+        if not ready:
+            print("没有可以爬取的站点")
+            return []
+
+        print(f"开始同时爬取 {len(ready)} 个站点: {', '.join(site.name for site in ready)}")
+        with ThreadPoolExecutor(max_workers=len(ready)) as executor:
+            results = list(executor.map(self.run_site, ready))
+
+        print("\n" + "=" * 50)
+        for name, ok, elapsed in results:
+            print(f"{name:10s} {'完成' if ok else '出错'}  耗时 {elapsed:.1f} 秒")
+        return results
+
+
+def main():
+    """主函数"""
+    from ZMJGCaseScraper import AdvancedZMJGScraper
+    from Jeecgcrawler import JeecgCrawler
+    from gouguoacrawler import GouguoaCrawler
+
+    print("多站点爬取")
+    print("=" * 50)
+    scheduler = CrawlScheduler()
+
+    if input("是否爬取 ZMJG 案件 (Y/n): ").strip().lower() != 'n':
+        username = input("ZMJG 用户名: ").strip()
+        password = input("ZMJG 密码: ").strip()
+        workers = input("ZMJG 并发线程数 (默认4): ").strip()
+        max_workers = int(workers) if workers.isdigit() and int(workers) > 0 else 4
+        scheduler.add(ZMJGSite(AdvancedZMJGScraper(username, password, max_workers=max_workers)))
+
+    if input("是否爬取 Jeecg 我的任务 (Y/n): ").strip().lower() != 'n':
+        scheduler.add(JeecgSite(JeecgCrawler(), "jeecg", "jeecg#123456"))
+
+    if input("是否爬取 Gouguoa 公文列表 (Y/n): ").strip().lower() != 'n':
+        session_id = input("Gouguoa PHPSESSID (留空则用验证码登录): ").strip()
+        if session_id:
+            scheduler.add(GouguoaSite(GouguoaCrawler(session_id=session_id)))
+        else:
+            username = input("Gouguoa 用户名: ").strip()
+            password = input("Gouguoa 密码: ").strip()
+            scheduler.add(GouguoaSite(GouguoaCrawler(), username, password))
+
+    if not scheduler.sites:
+        print("没有选择站点")
+        return
+
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\n用户中断了爬取过程")
+
+
+if __name__ == "__main__":
+    main()
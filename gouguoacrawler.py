@@ -1,112 +1,183 @@
-import requests
-from PIL import Image
-from io import BytesIO
-import pandas as pd
-import time
-
-session = requests.Session()
-session.cookies.set("PHPSESSID", "027f406ba3eda3aef162a62ea707f3f6")
-session.cookies.set("expires", "Wed, 17 Sep 2025 06:36:12 GMT")
-
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/140.0.0.0 Safari/537.36",
-    "Referer": "https://www.gouguoa.com/adm/official/datalist",
-    "Accept": "application/json, text/javascript, */*; q=0.01",
-    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6",
-    "X-Requested-With": "XMLHttpRequest"
-}
-
-url = "https://www.gouguoa.com/adm/official/datalist?page=1&limit=20"
-response = session.get(url, headers=headers)
-print(response.text)
-
-class GouguoaCrawler:
-    def __init__(self):
-        self.session = requests.Session()
-        self.base_url = "https://www.gouguoa.com"
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
-            "Referer": f"{self.base_url}/login"
-        }
-        self.uuid = None
-
-    def get_captcha(self):
-        """获取验证码图片和uuid"""
-        # 先访问登录页获取cookie
-        self.session.get(f"{self.base_url}/login", headers=self.headers)
-        # 生成uuid（实际项目请用抓包获得真实uuid参数）
-        self.uuid = str(int(time.time() * 1000))
-        captcha_url = f"{self.base_url}/captcha?uuid={self.uuid}"
-        response = self.session.get(captcha_url, headers=self.headers)
-        if response.status_code == 200 and response.headers.get("Content-Type", "").startswith("image"):
-            img = Image.open(BytesIO(response.content))
-            img.show()
-            print("验证码已弹出，请输入验证码")
-            return True
-        else:
-            print("验证码获取失败，返回内容：", response.text[:200])
-            return False
-
-    def login(self, username, password, captcha):
-        login_url = f"{self.base_url}/home/login/login_submit"
-        login_data = {
-            "username": username,
-            "password": password,
-            "captcha": captcha,
-            "uuid": self.uuid
-        }
-        headers = {
-            **self.headers,
-            "Content-Type": "application/json"
-        }
-        response = self.session.post(login_url, headers=headers, json=login_data)
-        result = response.json()
-        print("登录接口返回：", result)
-        if result.get("msg") == "登录成功":
-            print("登录成功！")
-            return True
-        else:
-            print(f"登录失败: {result.get('msg', '未知错误')}")
-            return False
-
-    def get_documents(self):
-        """获取公文管理-公文列表内容"""
-        documents_url = f"{self.base_url}/adm/official/datalist"
-        params = {
-            "page": 1,
-            "limit": 20
-        }
-        # 只用 session，不加 Authorization
-        response = self.session.get(documents_url, headers=self.headers, params=params)
-        try:
-            data = response.json()
-        except Exception:
-            print("公文列表接口返回异常：", response.text[:200])
-            return
-        if data.get("code") == 0:
-            records = data.get("data", {}).get("list", [])
-            if records:
-                import pandas as pd
-                df = pd.DataFrame(records)
-                df.to_excel("gouguoa_documents.xlsx", index=False)
-                print("公文数据已保存到 gouguoa_documents.xlsx")
-            else:
-                print("没有获取到公文数据")
-        else:
-            print("公文列表接口返回失败：", data.get("msg", "未知错误"))
-
-def main():
-    crawler = GouguoaCrawler()
-    if crawler.get_captcha():
-        username = input("请输入用户名: ")
-        password = input("请输入密码: ")
-        captcha = input("请输入验证码: ")
-        if crawler.login(username, password, captcha):
-            crawler.get_documents()
-        else:
-            print("登录失败，程序退出")
-    else:
-        print("获取验证码失败，程序退出")
-
-if __name__ == "__main__":
+import requests
+from PIL import Image
+from io import BytesIO
+import time
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from jsonl_export import jsonl_to_xlsx
+
+
+class GouguoaCrawler:
+    def __init__(self, max_workers=4, session_id=None):
+        self.session = requests.Session()
+        self.base_url = "https://www.gouguoa.com"
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
+            "Referer": f"{self.base_url}/login"
+        }
+        self.uuid = None
+        # 可以直接使用浏览器中登录后的 PHPSESSID，跳过验证码登录
+        if session_id:
+            self.session.cookies.set("PHPSESSID", session_id)
+        # 知道公文总数后，其余页面用有限的线程池并发获取
+        self.max_workers = max(1, int(max_workers))
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_captcha(self):
+        """获取验证码图片和uuid"""
+        # 先访问登录页获取cookie
+        self.session.get(f"{self.base_url}/login", headers=self.headers)
+        # 生成uuid（实际项目请用抓包获得真实uuid参数）
+        self.uuid = str(int(time.time() * 1000))
+        captcha_url = f"{self.base_url}/captcha?uuid={self.uuid}"
+        response = self.session.get(captcha_url, headers=self.headers)
+        if response.status_code == 200 and response.headers.get("Content-Type", "").startswith("image"):
+            img = Image.open(BytesIO(response.content))
+            img.show()
+            print("验证码已弹出，请输入验证码")
+            return True
+        else:
+            print("验证码获取失败，返回内容：", response.text[:200])
+            return False
+
+    def login(self, username, password, captcha):
+        login_url = f"{self.base_url}/home/login/login_submit"
+        login_data = {
+            "username": username,
+            "password": password,
+            "captcha": captcha,
+            "uuid": self.uuid
+        }
+        headers = {
+            **self.headers,
+            "Content-Type": "application/json"
+        }
+        response = self.session.post(login_url, headers=headers, json=login_data)
+        result = response.json()
+        print("登录接口返回：", result)
+        if result.get("msg") == "登录成功":
+            print("登录成功！")
+            return True
+        else:
+            print(f"登录失败: {result.get('msg', '未知错误')}")
+            return False
+
+    def fetch_document_page(self, page, limit):
+        """获取一页公文，返回 (记录列表, 总数)，失败返回 (None, None)"""
+        documents_url = f"{self.base_url}/adm/official/datalist"
+        params = {
+            "page": page,
+            "limit": limit
+        }
+        # 列表是 layui 表格使用的 AJAX 接口；只用 session，不加 Authorization
+        headers = {
+            **self.headers,
+            "Referer": documents_url,
+            "Accept": "application/json, text/javascript, */*; q=0.01",
+            "X-Requested-With": "XMLHttpRequest"
+        }
+        try:
+            response = self.session.get(documents_url, headers=headers, params=params, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+        except ValueError:
+            # requests 的 JSONDecodeError 同时继承 ValueError 和 RequestException，要先捕获
+            print("公文列表接口返回异常：", response.text[:200])
+            return None, None
+        except requests.RequestException as e:
+            print(f"第{page}页请求失败：{e}")
+            return None, None
+        if data.get("code") != 0:
+            print("公文列表接口返回失败：", data.get("msg", "未知错误"))
+            return None, None
+
+        # layui 格式为 {"code": 0, "count": 总数, "data": [...]}，也兼容 data 中带 list/count 的写法
+        payload = data.get("data")
+        if isinstance(payload, dict):
+            records = payload.get("list", [])
+            count = payload.get("count", data.get("count"))
+        else:
+            records = payload or []
+            count = data.get("count")
+        return records, int(count or 0)
+
+    def get_documents(self, limit=100, jsonl_file="gouguoa_documents.jsonl", xlsx_file="gouguoa_documents.xlsx"):
+        """获取公文管理-公文列表的全部内容，每页按页码顺序写入 JSONL，最后转换为 Excel"""
+        records, count = self.fetch_document_page(1, limit)
+        if records is None:
+            return
+        # 服务器可能把过大的 limit 截断到上限，按实际返回的条数计算页数
+        if len(records) < limit and count > len(records):
+            limit = len(records)
+        pages = -(-count // limit) if count and limit else 1
+        print(f"共{count}条公文，每页{limit}条，共{pages}页")
+
+        seen_ids = set()
+        saved = 0
+        failed_pages = []
+        with open(jsonl_file, "w", encoding="utf-8") as f:
+            def write_page(page, records):
+                nonlocal saved
+                for record in records:
+                    # 抓取过程中列表有变化时，相邻页面可能出现重复记录
+                    record_id = record.get("id")
+                    if record_id is not None:
+                        if record_id in seen_ids:
+                            continue
+                        seen_ids.add(record_id)
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    saved += 1
+                f.flush()
+                print(f"已获取第{page}页，共{len(records)}条")
+
+            write_page(1, records)
+
+            # 最多提前提交 max_workers*2 页，结果按页码顺序写入，内存占用与总页数无关
+            page_iter = iter(range(2, pages + 1))
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = deque()
+                for page in page_iter:
+                    pending.append((page, executor.submit(self.fetch_document_page, page, limit)))
+                    if len(pending) >= self.max_workers * 2:
+                        break
+                while pending:
+                    page, future = pending.popleft()
+                    records, _ = future.result()
+                    if records is None:
+                        records, _ = self.fetch_document_page(page, limit)
+                    if records is None:
+                        failed_pages.append(page)
+                    else:
+                        write_page(page, records)
+                    next_page = next(page_iter, None)
+                    if next_page is not None:
+                        pending.append((next_page, executor.submit(self.fetch_document_page, next_page, limit)))
+
+        if failed_pages:
+            print(f"以下页面获取失败：{failed_pages}")
+        if saved:
+            jsonl_to_xlsx(jsonl_file, xlsx_file)
+            print(f"公文数据已保存到 {xlsx_file}，共{saved}条")
+        else:
+            print("没有获取到公文数据")
+
+def main():
+    crawler = GouguoaCrawler()
+    if crawler.get_captcha():
+        username = input("请输入用户名: ")
+        password = input("请输入密码: ")
+        captcha = input("请输入验证码: ")
+        if crawler.login(username, password, captcha):
+            crawler.get_documents()
+        else:
+            print("登录失败，程序退出")
+    else:
+        print("获取验证码失败，程序退出")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
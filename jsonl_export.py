@@ -0,0 +1,38 @@
+"""JSONL 转 Excel
+
+Jeecg 和 Gouguoa 的爬虫都先把记录逐行写入 JSONL，最后用这里的函数转换为 Excel。
+需要 pip install openpyxl。
+"""
+import json
+
+
+def iter_jsonl(jsonl_file):
+    with open(jsonl_file, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def jsonl_to_xlsx(jsonl_file, xlsx_file):
+    """逐行把 JSONL 转成 Excel，使用 openpyxl 的只写模式，内存占用与记录数无关"""
+    from openpyxl import Workbook
+
+    # 第一遍收集所有字段名，保持首次出现的顺序
+    columns = {}
+    for record in iter_jsonl(jsonl_file):
+        for key in record:
+            columns.setdefault(key, None)
+    columns = list(columns)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(columns)
+    for record in iter_jsonl(jsonl_file):
+        row = []
+        for key in columns:
+            value = record.get(key)
+            # 嵌套的字段保存为 JSON 文本
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, ensure_ascii=False)
+            row.append(value)
+        ws.append(row)
+    wb.save(xlsx_file)
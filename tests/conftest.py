@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 各模块是项目根目录下的单个脚本，没有安装为包
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
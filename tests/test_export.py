@@ -0,0 +1,118 @@
+"""流式导出 CaseExporter 和 CaseExportReader"""
+import gzip
+import json
+import os
+
+import pytest
+
+from ZMJGCaseScraper import CaseExporter, CaseExportReader
+
+
+def case(number, text="内容"):
+    return {'case_number': number, 'url': f'/case/detail.do?id={number}',
+            'sections': {'案件信息': [{'title': '案件信息', 'data': [['案件编号', number], ['案由', text]]}]}}
+
+
+@pytest.fixture(params=['gzip', 'zstd'])
+def compression(request):
+    if request.param == 'zstd':
+        pytest.importorskip('zstandard')
+    return request.param
+
+
+def test_roundtrip_and_lookup(tmp_path, compression):
+    exporter = CaseExporter(str(tmp_path), compression=compression)
+    for number in ('A1', 'A2', 'A3'):
+        exporter.write(case(number))
+    exporter.close()
+
+    reader = CaseExportReader(str(tmp_path), compression=compression)
+    assert len(reader) == 3
+    assert 'A2' in reader and 'B1' not in reader
+    assert reader.get('A2') == case('A2')
+    assert reader.get('B1') is None
+    assert [detail['case_number'] for detail in reader] == ['A1', 'A2', 'A3']
+
+
+def test_latest_version_wins(tmp_path):
+    exporter = CaseExporter(str(tmp_path))
+    exporter.write(case('A1', "旧"))
+    exporter.write(case('A2'))
+    exporter.write(case('A1', "新"))
+    exporter.close()
+
+    reader = CaseExportReader(str(tmp_path))
+    assert reader.get('A1') == case('A1', "新")
+    assert [detail['case_number'] for detail in reader] == ['A2', 'A1']
+
+
+def test_file_is_plain_gzip_ndjson(tmp_path):
+    exporter = CaseExporter(str(tmp_path))
+    exporter.write(case('A1'))
+    exporter.write(case('A2'))
+    exporter.close()
+
+    with gzip.open(exporter.part_path(1), 'rt', encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == [case('A1'), case('A2')]
+
+
+def test_recovers_after_interrupted_write(tmp_path):
+    exporter = CaseExporter(str(tmp_path))
+    exporter.write(case('A1'))
+    exporter.write(case('A2'))
+    exporter.close()
+
+    # 模拟写到一半时中断：数据文件多出半条记录，索引多出不完整的一行
+    data_path = exporter.part_path(1)
+    with open(data_path, 'ab') as f:
+        f.write(gzip.compress(b'{"case_number": "A3"')[:10])
+    with open(data_path + '.idx', 'a', encoding='utf-8') as f:
+        f.write('A3\t99')
+
+    exporter = CaseExporter(str(tmp_path))
+    exporter.write(case('A4'))
+    exporter.close()
+
+    reader = CaseExportReader(str(tmp_path))
+    assert [detail['case_number'] for detail in reader] == ['A1', 'A2', 'A4']
+    with open(data_path + '.idx', encoding='utf-8') as f:
+        lines = [line.rstrip('\n').split('\t') for line in f]
+    assert os.path.getsize(data_path) == sum(int(length) for _, _, length in lines)
+
+
+def test_rotates_parts_and_reads_across_them(tmp_path):
+    # 约 1 KB 换一个文件
+    exporter = CaseExporter(str(tmp_path), rotate_mb=1 / 1024)
+    numbers = [f'A{i}' for i in range(20)]
+    for number in numbers:
+        exporter.write(case(number, "内容" * 50))
+    exporter.close()
+
+    assert os.path.exists(exporter.part_path(2))
+    reader = CaseExportReader(str(tmp_path))
+    assert [detail['case_number'] for detail in reader] == numbers
+    assert reader.get('A0') == case('A0', "内容" * 50)
+
+    # 再次运行时继续写最后一个文件
+    exporter = CaseExporter(str(tmp_path), rotate_mb=1 / 1024)
+    assert exporter.part_no >= 2
+    exporter.write(case('B1'))
+    exporter.close()
+    assert CaseExportReader(str(tmp_path)).get('B1') == case('B1')
+
+
+def test_write_after_close_reopens(tmp_path):
+    exporter = CaseExporter(str(tmp_path))
+    exporter.write(case('A1'))
+    exporter.close()
+    exporter.write(case('A2'))
+    exporter.close()
+    assert [detail['case_number'] for detail in CaseExportReader(str(tmp_path))] == ['A1', 'A2']
+
+
+def test_reader_includes_worker_files(tmp_path):
+    for worker in ('host-1', 'host-2'):
+        exporter = CaseExporter(str(tmp_path), prefix=f"案件导出-{worker}")
+        exporter.write(case(worker))
+        exporter.close()
+    assert sorted(detail['case_number'] for detail in CaseExportReader(str(tmp_path))) == ['host-1', 'host-2']
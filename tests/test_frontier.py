@@ -0,0 +1,113 @@
+"""分布式模式的共享案件队列 CaseFrontier"""
+import pytest
+
+import ZMJGCaseScraper
+from ZMJGCaseScraper import CaseFrontier
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ZMJGCaseScraper.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def frontier(tmp_path, clock):
+    frontier = CaseFrontier(str(tmp_path / "爬取队列.db"), lease_seconds=10, max_attempts=3)
+    frontier.add([({'案件编号': f'C{i}'}, f'fp{i}', False) for i in range(3)])
+    yield frontier
+    frontier.conn.close()
+
+
+def row(frontier, case_number):
+    return frontier.conn.execute("SELECT state, worker, attempts FROM frontier WHERE case_number = ?",
+                                 (case_number,)).fetchone()
+
+
+def test_claim_in_list_order_and_leases_exclusive(frontier):
+    assert [case['案件编号'] for case in frontier.claim('w1', n=2)] == ['C0', 'C1']
+    assert [case['案件编号'] for case in frontier.claim('w2', n=5)] == ['C2']
+    assert frontier.claim('w3') == []
+    assert row(frontier, 'C0') == ('leased', 'w1', 0)
+
+
+def test_expired_lease_is_reclaimed_and_counted(frontier, clock):
+    frontier.claim('w1', n=3)
+    clock.now += 11
+    assert [case['案件编号'] for case in frontier.claim('w2')] == ['C0']
+    assert row(frontier, 'C0') == ('leased', 'w2', 1)
+
+
+def test_heartbeat_extends_leases(frontier, clock):
+    frontier.claim('w1')
+    clock.now += 8
+    frontier.heartbeat('w1')
+    clock.now += 7
+    assert [case['案件编号'] for case in frontier.claim('w2')] == ['C1']
+    clock.now += 4
+    assert [case['案件编号'] for case in frontier.claim('w2')] == ['C0']
+
+
+def test_case_that_keeps_expiring_is_failed(frontier, clock):
+    # 每次领取后 worker 都崩溃，租约过期
+    for _ in range(5):
+        frontier.claim('w1', n=3)
+        clock.now += 11
+    assert row(frontier, 'C0')[0] == 'failed'
+    assert row(frontier, 'C0')[2] == 3
+    assert frontier.counts() == {'failed': 3}
+
+
+def test_fail_requeues_until_max_attempts(frontier):
+    for attempt in range(1, 4):
+        assert frontier.claim('w1')[0]['案件编号'] == 'C0'
+        frontier.fail('C0', 'w1')
+        assert row(frontier, 'C0')[2] == attempt
+    assert row(frontier, 'C0')[0] == 'failed'
+    assert frontier.claim('w1')[0]['案件编号'] == 'C1'
+
+
+def test_fail_from_other_worker_is_ignored(frontier):
+    frontier.claim('w1')
+    frontier.fail('C0', 'w2')
+    assert row(frontier, 'C0') == ('leased', 'w1', 0)
+
+
+def test_complete_and_refresh(frontier):
+    frontier.claim('w1')
+    frontier.complete('C0')
+    assert row(frontier, 'C0')[0] == 'done'
+    # 增量模式下指纹变化的已完成案件重新排队，指纹相同的保持完成
+    frontier.add([({'案件编号': 'C0'}, 'fp0', False)], refresh=True)
+    assert row(frontier, 'C0')[0] == 'done'
+    frontier.add([({'案件编号': 'C0', '结案时间': '2023-04-01'}, 'changed', False)], refresh=True)
+    assert row(frontier, 'C0') == ('pending', None, 0)
+
+
+def test_seed_lease(frontier, clock):
+    assert frontier.claim_seed('w1')
+    assert not frontier.claim_seed('w2')
+    # 翻页出错时释放，其他 worker 接手
+    frontier.release_seed('w1', done=False)
+    assert frontier.claim_seed('w2')
+    frontier.release_seed('w2', done=True)
+    assert frontier.seeded()
+    assert not frontier.claim_seed('w1')
+
+
+def test_finished(frontier):
+    frontier.claim_seed('w1')
+    frontier.release_seed('w1', done=True)
+    assert not frontier.finished()
+    for case in frontier.claim('w1', n=3):
+        frontier.complete(case['案件编号'])
+    assert frontier.finished()
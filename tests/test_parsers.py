@@ -0,0 +1,90 @@
+"""各解析后端在 fixtures/ 页面上的结果"""
+
+import pytest
+
+from ZMJGCaseScraper import ZMJGCaseScraper, parse_html
+from zmjg_benchmark import FIXTURE_DIR, HTML_PARSER_MALFORMED_FIXTURES, read_pages
+
+FIXTURES = dict(read_pages(FIXTURE_DIR))
+HTML5_BACKENDS = ('lxml', 'selectolax')
+
+
+def require_backend(backend):
+    if backend == 'lxml':
+        pytest.importorskip('lxml')
+    elif backend == 'selectolax':
+        pytest.importorskip('selectolax')
+
+
+def parse_outputs(backend, name, tmp_path):
+    """与 zmjg_benchmark.py parsers 比较相同的三项结果"""
+    scraper = ZMJGCaseScraper('', '', parser=backend, output_dir=str(tmp_path))
+    doc = parse_html(FIXTURES[name], backend)
+    return (scraper.parse_case_list(doc),
+            scraper.extract_table_data(doc),
+            scraper.parse_case_detail(name, name, doc))
+
+
+def test_fixtures_present():
+    assert {'list_1.html', 'list_2.html', 'detail_1.html', 'detail_2.html', 'detail_3.html'} <= set(FIXTURES)
+    assert set(HTML_PARSER_MALFORMED_FIXTURES) <= set(FIXTURES)
+
+
+@pytest.mark.parametrize('backend', HTML5_BACKENDS)
+@pytest.mark.parametrize('name', sorted(FIXTURES))
+def test_backend_matches_html_parser(name, backend, tmp_path):
+    if name in HTML_PARSER_MALFORMED_FIXTURES:
+        pytest.skip("html.parser 不补全省略的结束标签")
+    require_backend(backend)
+    assert parse_outputs(backend, name, tmp_path) == parse_outputs('html.parser', name, tmp_path)
+
+
+@pytest.mark.parametrize('name', sorted(FIXTURES))
+def test_html5_backends_agree(name, tmp_path):
+    for backend in HTML5_BACKENDS:
+        require_backend(backend)
+    assert parse_outputs('selectolax', name, tmp_path) == parse_outputs('lxml', name, tmp_path)
+
+
+@pytest.mark.parametrize('backend', ('html.parser',) + HTML5_BACKENDS)
+def test_list_page_cases(backend, tmp_path):
+    require_backend(backend)
+    cases = parse_outputs(backend, 'list_2.html', tmp_path)[0]
+    assert [case['案件编号'] for case in cases] == ['某烟立〔2023〕第0005号', '某烟立〔2023〕第0006号']
+    assert cases[0]['详情链接'] == ['http://zmjg.zm.sc.yc/case/detail.do?id=1005']
+
+
+@pytest.mark.parametrize('backend', HTML5_BACKENDS)
+def test_list_page_with_omitted_end_tags(backend, tmp_path):
+    require_backend(backend)
+    cases = parse_outputs(backend, 'list_1.html', tmp_path)[0]
+    # 注释掉的行和每行中的表单不算案件
+    assert [case['案件编号'] for case in cases] == [f'某烟立〔2023〕第000{i}号' for i in range(1, 5)]
+    assert cases[3]['详情链接'] == ['http://zmjg.zm.sc.yc/case/detail.do?id=1004']
+
+
+@pytest.mark.parametrize('backend', ('html.parser',) + HTML5_BACKENDS)
+def test_detail_sections_ignore_scripts_and_comments(backend, tmp_path):
+    require_backend(backend)
+    sections = parse_outputs(backend, 'detail_1.html', tmp_path)[2]['sections']
+    # 注释 <!-- 涉案人信息 ... --> 和脚本中的标签名不能当作标题
+    assert [table['title'] for table in sections['涉案人信息']] == ['涉案人信息']
+    assert sections['涉案人信息'][0]['data'][0][0] == '姓名'
+    assert sections['案件信息'][0]['data'][0][:2] == ['案件编号', '某烟立〔2023〕第0001号']
+    assert len(sections['承办信息']) == 2
+    assert sections['举报记录表'] == []
+
+
+@pytest.mark.parametrize('backend', HTML5_BACKENDS)
+def test_detail_sections_in_layout_table(backend, tmp_path):
+    require_backend(backend)
+    sections = parse_outputs(backend, 'detail_2.html', tmp_path)[2]['sections']
+    assert sections['案件信息'] == []
+    assert [len(sections[name]) for name in ('举报记录表', '物品确认', '结案报告表')] == [1, 1, 1]
+
+
+@pytest.mark.parametrize('backend', ('html.parser',) + HTML5_BACKENDS)
+def test_detail_without_headings_keeps_all_tables(backend, tmp_path):
+    require_backend(backend)
+    sections = parse_outputs(backend, 'detail_3.html', tmp_path)[2]['sections']
+    assert [table['title'] for table in sections['所有表格']] == ['表格1', '表格2']
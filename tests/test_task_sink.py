@@ -0,0 +1,111 @@
+"""Jeecg 任务的 JSONL 写入、续传和去重 TaskSink"""
+import json
+import os
+
+import pytest
+
+from Jeecgcrawler import TaskSink
+
+
+def records(*ids):
+    return [{'id': record_id, 'name': f'任务{record_id}'} for record_id in ids]
+
+
+def read_ids(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line)['id'] for line in f]
+
+
+def test_writes_pages_and_drops_duplicates(tmp_path):
+    path = str(tmp_path / "tasks.jsonl")
+    sink = TaskSink(path)
+    sink.open(3)
+    assert sink.write_page(1, records(1, 2, 3)) == 3
+    # 抓取过程中插入了新任务，第2页开头重复上一页的最后一条
+    assert sink.write_page(2, records(3, 4, 5)) == 2
+    sink.close()
+
+    assert read_ids(path) == [1, 2, 3, 4, 5]
+    assert sink.count == 5
+    with open(path + ".state.json", encoding='utf-8') as f:
+        assert json.load(f)['pages_done'] == 2
+
+
+def test_resume_after_interruption(tmp_path):
+    path = str(tmp_path / "tasks.jsonl")
+    sink = TaskSink(path)
+    sink.open(3)
+    sink.write_page(1, records(1, 2, 3))
+    # 第2页写到一半时中断，没有保存续传状态
+    sink.file.write(b'{"id": 4, "name": "')
+    sink.close()
+
+    sink = TaskSink(path)
+    assert (sink.page_size, sink.pages_done, sink.count) == (3, 1, 3)
+    assert sink.seen_ids == {1, 2, 3}
+    assert read_ids(path) == [1, 2, 3]
+
+    sink.open(3)
+    assert sink.write_page(2, records(3, 4, 5)) == 2
+    sink.close()
+    assert read_ids(path) == [1, 2, 3, 4, 5]
+
+
+def test_page_size_change_starts_over(tmp_path):
+    path = str(tmp_path / "tasks.jsonl")
+    sink = TaskSink(path)
+    sink.open(3)
+    sink.write_page(1, records(1, 2, 3))
+    sink.close()
+
+    # 每页条数不同时页码对不上，不能续传
+    sink = TaskSink(path)
+    sink.open(2)
+    assert (sink.pages_done, sink.count, sink.seen_ids) == (0, 0, set())
+    sink.write_page(1, records(1, 2))
+    sink.close()
+    assert read_ids(path) == [1, 2]
+
+
+def test_finish_removes_state(tmp_path):
+    path = str(tmp_path / "tasks.jsonl")
+    sink = TaskSink(path)
+    sink.open(3)
+    sink.write_page(1, records(1, 2))
+    sink.finish()
+    assert not os.path.exists(path + ".state.json")
+
+    sink = TaskSink(path)
+    assert sink.page_size is None and sink.pages_done == 0
+    # 没有续传状态时重新开始，清空上次的文件
+    sink.open(3)
+    sink.close()
+    assert read_ids(path) == []
+
+
+def test_corrupt_state_starts_over(tmp_path):
+    path = str(tmp_path / "tasks.jsonl")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 1}) + "\n")
+    with open(path + ".state.json", 'w', encoding='utf-8') as f:
+        f.write("{")
+
+    sink = TaskSink(path)
+    assert sink.page_size is None
+    sink.open(3)
+    sink.close()
+    assert os.path.getsize(path) == 0
+
+
+def test_to_xlsx(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = str(tmp_path / "tasks.jsonl")
+    sink = TaskSink(path)
+    sink.open(2)
+    sink.write_page(1, [{'id': 1, 'name': '任务1'}, {'id': 2, 'extra': {'a': 1}}])
+    sink.finish()
+
+    xlsx_path = str(tmp_path / "tasks.xlsx")
+    sink.to_xlsx(xlsx_path)
+    rows = list(openpyxl.load_workbook(xlsx_path).active.values)
+    assert rows == [('id', 'name', 'extra'), (1, '任务1', None), (2, None, '{"a": 1}')]
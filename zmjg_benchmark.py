@@ -0,0 +1,531 @@
+"""ZMJG 爬虫性能测试
+
+用本地生成的案件详情页测量解析耗时，不访问正式网站。
+
+用法：
+python zmjg_benchmark.py parse --pages 20 --rows 200
+python zmjg_benchmark.py parsers [--pages-dir 保存的页面目录]
+python zmjg_benchmark.py processes --pages 40 --rows 200
+python zmjg_benchmark.py decode --pages 20 --rows 50
+python zmjg_benchmark.py crawl --cases 200 --workers 8 --latency 0.05 --error-rate 0.02
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from ZMJGCaseScraper import (CASE_SECTIONS, PARSER_BACKENDS, AdaptiveRateLimiter, AdvancedZMJGScraper,
+                             CrawlMetrics, DistributedZMJGScraper, EncodingDetector, RetryPolicy, ZMJGCaseScraper,
+                             extract_sections, parse_case_detail_page, parse_html, table_rows)
+
+
+def make_detail_page(case_id, rows=50, cols=8, extra_tables=10):
+    """生成一个大型案件详情页：每个部分一个标题和表格，另加若干无标题表格"""
+    parts = ['<html><head><title>案件详情</title></head><body>']
+    parts.append(f'<div class="header">案件编号 ZM{case_id:06d} 案件信息 涉案人信息 涉案物品</div>')
+    for section in CASE_SECTIONS:
+        parts.append(f'<div class="panel"><div class="panel-title"><span>{section}</span></div>')
+        parts.append('<table class="grid"><tr>')
+        parts.append(''.join(f'<th>字段{c}</th>' for c in range(cols)))
+        parts.append('</tr>')
+        for r in range(rows):
+            parts.append('<tr>' + ''.join(f'<td> 值{r}-{c} </td>' for c in range(cols)) + '</tr>')
+        parts.append('</table></div>')
+    for t in range(extra_tables):
+        parts.append('<table class="layout"><tr>')
+        parts.append(''.join(f'<td><a href="#">操作{t}-{c}</a></td>' for c in range(cols)))
+        parts.append('</tr></table>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def make_list_page(page_no, per_page=20, pages=5, cases=None):
+    """生成一页案件综合查询列表，cases 为案件总数（默认 per_page * pages）"""
+    headers = ['案件编号', '查获单位', '承办部门', '当事人', '录入时间', '结案时间', '操作']
+    parts = ['<html><body><div class="toolbar"><a href="#">查询</a></div>']
+    parts.append('<table class="list"><tr>' + ''.join(f'<th>{h}</th>' for h in headers) + '</tr>')
+    end = page_no * per_page if cases is None else min(page_no * per_page, cases)
+    for i in range((page_no - 1) * per_page, end):
+        parts.append(f'<tr><td>ZM{i:06d}</td><td>某烟草专卖局</td><td>稽查科</td><td>当事人{i}</td>'
+                     f'<td>2024-01-01 10:00</td><td></td>'
+                     f'<td><a href="/case/detail?id={i}">详情</a> <a href="/case/print?id={i}">打印</a></td></tr>')
+    parts.append('</table>')
+    if page_no < pages:
+        parts.append(f'<div class="pager"><a href="/case/list?page={page_no + 1}">下一页</a></div>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+# 仓库中保存的脱敏页面：含脚本、注释、表单和不规范的HTML
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# 省略了 </td>、</tr> 的页面：html.parser 不按 HTML5 补全结束标签，会把后面的单元格嵌进
+# 前一个；这些页面上只要求 lxml 和 selectolax 的结果彼此一致
+HTML_PARSER_MALFORMED_FIXTURES = ('list_1.html', 'detail_2.html')
+
+
+def read_pages(pages_dir):
+    """读取目录中保存的页面（*.html）"""
+    pages = []
+    for name in sorted(os.listdir(pages_dir)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(pages_dir, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def load_fixture_pages(pages_dir=None, count=5):
+    """读取保存的页面；未指定目录时使用 fixtures/ 中的页面，另加生成的列表页和详情页"""
+    if pages_dir:
+        return read_pages(pages_dir)
+
+    pages = read_pages(FIXTURE_DIR) if os.path.isdir(FIXTURE_DIR) else []
+    pages += [(f'generated_list_{i}.html', make_list_page(i)) for i in range(1, 3)]
+    pages += [(f'generated_detail_{i}.html', make_detail_page(i, rows=50)) for i in range(count)]
+    return pages
+
+
+def legacy_extract_sections(soup):
+    """优化前 get_case_detail 的解析方式，用于对比"""
+    sections = {name: [] for name in CASE_SECTIONS}
+
+    all_tables = []
+    for table in soup.find_all('table'):
+        data = table_rows(table)
+        if data:
+            all_tables.append(data)
+
+    page_text = soup.get_text()
+    for section_name in sections.keys():
+        if section_name in page_text:
+            section_tables = []
+            for element in soup.find_all(string=re.compile(section_name)):
+                next_table = element.parent.find_next('table')
+                if next_table:
+                    table_data = []
+                    for row in next_table.find_all('tr'):
+                        row_data = [cell.get_text().strip() for cell in row.find_all(['td', 'th'])]
+                        if any(row_data):
+                            table_data.append(row_data)
+                    if table_data:
+                        section_tables.append({'title': section_name, 'data': table_data})
+            sections[section_name] = section_tables
+    return sections
+
+
+def time_per_page(func, soups, rounds):
+    """返回每页平均耗时（毫秒）"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for soup in soups:
+            func(soup)
+        elapsed = (time.perf_counter() - start) / len(soups) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_parse(args):
+    """对比优化前后 get_case_detail 的部分解析耗时"""
+    pages = [make_detail_page(i, rows=args.rows, cols=args.cols) for i in range(args.pages)]
+    print(f"详情页: {args.pages} 个，每页约 {len(pages[0]) // 1024} KB，"
+          f"{len(CASE_SECTIONS)} 个部分 x {args.rows} 行 x {args.cols} 列")
+
+    soups = [BeautifulSoup(page, 'html.parser') for page in pages]
+
+    for soup in soups:
+        if legacy_extract_sections(soup) != extract_sections(soup):
+            raise SystemExit("解析结果不一致")
+
+    before = time_per_page(legacy_extract_sections, soups, args.rounds)
+    after = time_per_page(extract_sections, soups, args.rounds)
+    print(f"优化前: {before:8.2f} ms/页")
+    print(f"优化后: {after:8.2f} ms/页")
+    print(f"加速比: {before / after:8.2f}x")
+
+
+def bench_parsers(args):
+    """检查各解析后端在同一批页面上的结果是否一致，并比较耗时"""
+    pages = load_fixture_pages(args.pages_dir)
+    if not pages:
+        raise SystemExit("没有找到页面")
+    print(f"页面: {len(pages)} 个")
+
+    output_dir = tempfile.mkdtemp()
+    results = {}
+    for backend in PARSER_BACKENDS:
+        try:
+            parse_html('<html></html>', backend)
+        except Exception as e:
+            print(f"{backend:12s} 不可用: {e}")
+            continue
+
+        scraper = ZMJGCaseScraper('', '', parser=backend, output_dir=output_dir)
+        outputs = []
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, html in pages:
+                doc = parse_html(html, backend)
+                outputs.append((scraper.parse_case_list(doc),
+                                scraper.extract_table_data(doc),
+                                scraper.parse_case_detail(name, name, doc)))
+        elapsed = (time.perf_counter() - start) / len(pages) * 1000
+        results[backend] = outputs
+        print(f"{backend:12s} {elapsed:8.2f} ms/页")
+
+    baseline = results.get('html.parser')
+    others = [backend for backend in results if backend != 'html.parser']
+    labels = ('parse_case_list', 'extract_table_data', 'get_case_detail')
+    # 只有仓库中的 fixtures 才有已知差异；--pages-dir 的页面与 html.parser 不同一律算不一致
+    malformed = () if args.pages_dir else HTML_PARSER_MALFORMED_FIXTURES
+    mismatches = 0
+    known = 0
+    for i, (name, _) in enumerate(pages):
+        for j, label in enumerate(labels):
+            if name in malformed and others:
+                # 以第一个 HTML5 后端为准比较其余后端
+                expected = results[others[0]][i][j]
+                if baseline[i][j] != expected:
+                    known += 1
+                    print(f"html.parser 已知差异: {name} {label}")
+                differing = [backend for backend in others[1:] if results[backend][i][j] != expected]
+            else:
+                expected = baseline[i][j]
+                differing = [backend for backend in others if results[backend][i][j] != expected]
+            for backend in differing:
+                mismatches += 1
+                print(f"不一致: {backend} {name} {label}")
+
+    if mismatches:
+        raise SystemExit(f"共 {mismatches} 处结果不一致")
+    if known:
+        print(f"html.parser 有 {known} 处结果与其他后端不同（页面省略了结束标签），其余结果一致")
+    else:
+        print("各解析后端结果一致")
+
+
+def bench_processes(args):
+    """详情页交给不同数量的解析进程时的吞吐量"""
+    pages = [make_detail_page(i, rows=args.rows, cols=args.cols) for i in range(args.pages)]
+    print(f"详情页: {args.pages} 个，每页约 {len(pages[0]) // 1024} KB，解析后端 {args.parser}，"
+          f"CPU核数 {os.cpu_count()}")
+
+    jobs = [(f'ZM{i:06d}', f'/case/detail?id={i}', html, args.parser) for i, html in enumerate(pages)]
+
+    start = time.perf_counter()
+    expected = [parse_case_detail_page(*job) for job in jobs]
+    elapsed = time.perf_counter() - start
+    print(f"{'线程内解析':10s} {args.pages / elapsed:8.1f} 页/秒")
+
+    for processes in args.processes:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+            # 先让每个进程完成导入，启动时间不计入吞吐量
+            list(pool.map(parse_html, ['<html></html>'] * processes))
+            start = time.perf_counter()
+            results = list(pool.map(parse_case_detail_page, *zip(*jobs)))
+            elapsed = time.perf_counter() - start
+        if results != expected:
+            raise SystemExit(f"{processes} 个进程的解析结果不一致")
+        print(f"{processes:2d} 个进程   {args.pages / elapsed:8.1f} 页/秒")
+
+
+def make_response(url, body, content_type):
+    """构造一个 requests 响应对象，不经过网络"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.headers['Content-Type'] = content_type
+    return response
+
+
+def bench_decode(args):
+    """对比每页 apparent_encoding 识别编码与 EncodingDetector 的解码耗时"""
+    pages = [make_detail_page(i, rows=args.rows, cols=args.cols) for i in range(args.pages)]
+    print(f"详情页: {args.pages} 个，每页约 {len(pages[0].encode(args.encoding)) // 1024} KB，编码 {args.encoding}")
+
+    # 编码声明的三种情况：响应头、<meta>、都没有（需要识别）
+    profiles = [
+        ('响应头 charset', f'text/html; charset={args.encoding}', ''),
+        ('<meta charset>', 'text/html', f'<meta charset="{args.encoding}">'),
+        ('未声明', 'text/html', ''),
+    ]
+    # 预先导入编码识别库，导入时间不计入结果
+    make_response('http://zmjg.example/', pages[0].encode(args.encoding), 'text/html').apparent_encoding
+
+    for label, content_type, meta in profiles:
+        bodies = [page.replace('<head>', '<head>' + meta, 1).encode(args.encoding) for page in pages]
+        urls = [f'http://zmjg.example/case/detail?id={i}' for i in range(len(bodies))]
+
+        start = time.perf_counter()
+        before = []
+        for url, body in zip(urls, bodies):
+            response = make_response(url, body, content_type)
+            response.encoding = response.apparent_encoding or 'utf-8'
+            before.append(response.text)
+        before_ms = (time.perf_counter() - start) / len(bodies) * 1000
+
+        detector = EncodingDetector()
+        start = time.perf_counter()
+        after = []
+        for url, body in zip(urls, bodies):
+            response = make_response(url, body, content_type)
+            html, response.encoding = detector.decode(response.url, response.headers.get('Content-Type'),
+                                                      response.content)
+            after.append(html)
+        after_ms = (time.perf_counter() - start) / len(bodies) * 1000
+
+        if before != after:
+            raise SystemExit(f"{label}: 解码结果不一致")
+        print(f"{label:14s} apparent_encoding {before_ms:8.2f} ms/页   EncodingDetector {after_ms:8.2f} ms/页   "
+              f"每页节省 {before_ms - after_ms:8.2f} ms")
+
+
+LOGIN_PAGE = ('<html><head><title>登录</title></head><body><form action="/login" method="post">'
+              '<input type="text" name="username"><input type="password" name="password">'
+              '<input type="submit" value="登录"></form></body></html>')
+HOME_PAGE = '<html><head><title>首页</title></head><body><a href="/case/list?page=1">案件综合查询</a></body></html>'
+
+
+def serve_stand_in(config, port_queue):
+    """在子进程中运行本地替身服务器，提供登录页、案件列表和详情页"""
+    pages = -(-config['cases'] // config['per_page'])
+    # 详情页只有案件编号不同，预先生成一次，请求时替换编号
+    template = make_detail_page(0, rows=config['rows'], cols=config['cols']).encode('utf-8')
+    placeholder = b'ZM000000'
+    rng = random.Random(config['seed'])
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def send_body(self, body, status=200, headers=()):
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def delay(self):
+            if config['latency']:
+                with lock:
+                    jitter = rng.uniform(0.5, 1.5)
+                time.sleep(config['latency'] * jitter)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.delay()
+            self.send_body(HOME_PAGE, headers=[('Set-Cookie', 'sid=bench; Path=/')])
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            self.delay()
+            if url.path == '/':
+                logged_in = 'sid=bench' in self.headers.get('Cookie', '')
+                self.send_body(HOME_PAGE if logged_in else LOGIN_PAGE)
+            elif url.path == '/case/list':
+                page_no = int(query.get('page', ['1'])[0])
+                self.send_body(make_list_page(page_no, config['per_page'], pages, config['cases']))
+            elif url.path == '/case/detail':
+                with lock:
+                    failed = rng.random() < config['error_rate']
+                if failed:
+                    self.send_body('服务器繁忙', status=503)
+                    return
+                case_id = int(query['id'][0])
+                self.send_body(template.replace(placeholder, f'ZM{case_id:06d}'.encode('ascii'), 1))
+            else:
+                self.send_body('not found', status=404)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def peak_rss_mb():
+    """当前进程的内存峰值（MB），无法获取时返回None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1024 / 1024
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def dir_size(path):
+    """目录下所有文件的总字节数"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+SCRAPER_CLASSES = {'basic': ZMJGCaseScraper, 'advanced': AdvancedZMJGScraper, 'distributed': DistributedZMJGScraper}
+
+
+def run_crawl(mode, base_url, output_dir, options, results=None):
+    """创建爬虫并完整爬取一次，返回 (耗时, 指标快照, 内存峰值)；在子进程中运行时结果放入 results 队列"""
+    options = dict(options)
+    max_rate = options.pop('max_rate')
+    retry_budget = options.pop('retry_budget')
+    scraper = SCRAPER_CLASSES[mode]('bench', 'bench', output_dir=output_dir,
+                                    rate_limiter=AdaptiveRateLimiter(initial_rate=max_rate, max_rate=max_rate),
+                                    retry_policy=RetryPolicy(base_delay=0.05, max_delay=1.0,
+                                                             retry_budget=retry_budget),
+                                    **options)
+    scraper.base_url = base_url
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        scraper.scrape_all_cases()
+    outcome = (time.perf_counter() - start, scraper.metrics.snapshot(), peak_rss_mb())
+    if results is not None:
+        results.put(outcome)
+    return outcome
+
+
+def bench_crawl(args):
+    """启动本地替身服务器，完整运行一次爬取并统计吞吐量"""
+    config = {'cases': args.cases, 'per_page': args.per_page, 'rows': args.rows, 'cols': args.cols,
+              'latency': args.latency, 'error_rate': args.error_rate, 'seed': args.seed}
+    ctx = multiprocessing.get_context('spawn')
+    port_queue = ctx.Queue()
+    # 服务器放在单独的进程中，生成页面不占用爬虫进程的CPU和GIL
+    server = ctx.Process(target=serve_stand_in, args=(config, port_queue), daemon=True)
+    server.start()
+    base_url = f'http://127.0.0.1:{port_queue.get(timeout=30)}'
+
+    output_dir = tempfile.mkdtemp(prefix='zmjg_bench_')
+    options = {'max_workers': args.workers, 'parser': args.parser, 'storage': args.storage,
+               'writer_threads': args.writer_threads, 'parse_processes': args.parse_processes,
+               'export_ndjson': args.export, 'max_rate': args.max_rate, 'retry_budget': args.cases}
+    processes = args.worker_processes if args.mode == 'distributed' else 1
+
+    print(f"替身服务器: {base_url}，{args.cases} 个案件，每页 {args.per_page} 个，"
+          f"详情页约 {len(make_detail_page(0, rows=args.rows, cols=args.cols).encode('utf-8')) // 1024} KB，"
+          f"延迟 {args.latency * 1000:.0f} ms，错误率 {args.error_rate:.0%}")
+    print(f"爬虫: {SCRAPER_CLASSES[args.mode].__name__} x {processes} 个进程，每个 {args.workers} 个线程，"
+          f"解析后端 {args.parser}，保存方式 {args.storage}")
+
+    try:
+        if processes == 1:
+            outcomes = [run_crawl(args.mode, base_url, output_dir, options)]
+        else:
+            # 分布式模式：多个 worker 进程共享输出目录中的 爬取队列.db
+            results = ctx.Queue()
+            workers = [ctx.Process(target=run_crawl, args=(args.mode, base_url, output_dir, options, results))
+                       for _ in range(processes)]
+            for worker in workers:
+                worker.start()
+            outcomes = [results.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+
+        elapsed = max(outcome[0] for outcome in outcomes)
+        metrics = CrawlMetrics()
+        for _, snapshot, _ in outcomes:
+            metrics.merge(snapshot)
+        snapshot = metrics.snapshot()
+        saved = snapshot['counters'].get('cases_saved', 0)
+        request = snapshot['stages'].get('request', {})
+        rss = [outcome[2] for outcome in outcomes if outcome[2] is not None]
+        print(f"耗时:         {elapsed:8.2f} 秒")
+        print(f"成功案件:     {saved:8d} / {args.cases}")
+        print(f"吞吐量:       {saved / elapsed:8.2f} 案件/秒")
+        print(f"请求延迟 p50: {request.get('p50_seconds', 0) * 1000:8.1f} ms")
+        print(f"请求延迟 p99: {request.get('p99_seconds', 0) * 1000:8.1f} ms")
+        print(f"重试次数:     {snapshot['counters'].get('retries', 0):8d}")
+        print(f"内存峰值:     {max(rss):8.1f} MB（单个进程）" if rss else "内存峰值:     无法获取")
+        print(f"写入字节:     {dir_size(output_dir) / 1024 / 1024:8.2f} MB")
+    finally:
+        server.terminate()
+        if args.keep:
+            print(f"输出目录: {output_dir}")
+        else:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZMJG 爬虫性能测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parse_cmd = subparsers.add_parser('parse', help="详情页部分解析耗时")
+    parse_cmd.add_argument('--pages', type=int, default=20, help="详情页数量")
+    parse_cmd.add_argument('--rows', type=int, default=200, help="每个表格的行数")
+    parse_cmd.add_argument('--cols', type=int, default=8, help="每个表格的列数")
+    parse_cmd.add_argument('--rounds', type=int, default=3, help="重复次数，取最快一次")
+    parse_cmd.set_defaults(func=bench_parse)
+
+    parsers_cmd = subparsers.add_parser('parsers', help="各解析后端结果一致性和耗时")
+    parsers_cmd.add_argument('--pages-dir', help="保存的 .html 页面目录，不指定时使用 fixtures/ 和生成的页面")
+    parsers_cmd.set_defaults(func=bench_parsers)
+
+    processes_cmd = subparsers.add_parser('processes', help="解析进程池吞吐量")
+    processes_cmd.add_argument('--pages', type=int, default=40, help="详情页数量")
+    processes_cmd.add_argument('--rows', type=int, default=200, help="每个表格的行数")
+    processes_cmd.add_argument('--cols', type=int, default=8, help="每个表格的列数")
+    processes_cmd.add_argument('--parser', default='html.parser', choices=PARSER_BACKENDS, help="解析后端")
+    processes_cmd.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, 8], help="解析进程数")
+    processes_cmd.set_defaults(func=bench_processes)
+
+    decode_cmd = subparsers.add_parser('decode', help="响应解码耗时")
+    decode_cmd.add_argument('--pages', type=int, default=20, help="详情页数量")
+    decode_cmd.add_argument('--rows', type=int, default=50, help="每个表格的行数")
+    decode_cmd.add_argument('--cols', type=int, default=8, help="每个表格的列数")
+    decode_cmd.add_argument('--encoding', default='gb18030', help="页面编码")
+    decode_cmd.set_defaults(func=bench_decode)
+
+    crawl_cmd = subparsers.add_parser('crawl', help="使用本地替身服务器完整运行一次爬取")
+    crawl_cmd.add_argument('--cases', type=int, default=200, help="案件数量")
+    crawl_cmd.add_argument('--per-page', type=int, default=20, help="列表每页案件数")
+    crawl_cmd.add_argument('--rows', type=int, default=50, help="详情页每个表格的行数")
+    crawl_cmd.add_argument('--cols', type=int, default=8, help="详情页每个表格的列数")
+    crawl_cmd.add_argument('--latency', type=float, default=0.05, help="服务器平均响应延迟（秒）")
+    crawl_cmd.add_argument('--error-rate', type=float, default=0.0, help="详情页返回503的比例")
+    crawl_cmd.add_argument('--seed', type=int, default=1, help="随机延迟和错误的种子")
+    crawl_cmd.add_argument('--mode', choices=('basic', 'advanced', 'distributed'), default='basic', help="爬虫版本")
+    crawl_cmd.add_argument('--worker-processes', type=int, default=2, help="分布式模式的 worker 进程数")
+    crawl_cmd.add_argument('--workers', type=int, default=8, help="抓取线程数")
+    crawl_cmd.add_argument('--parser', default='html.parser', choices=PARSER_BACKENDS, help="解析后端")
+    crawl_cmd.add_argument('--storage', choices=('files', 'sqlite', 'blobs'), default='files', help="保存方式")
+    crawl_cmd.add_argument('--export', choices=('gzip', 'zstd'), help="同时流式导出压缩 NDJSON")
+    crawl_cmd.add_argument('--writer-threads', type=int, default=0, help="写入线程数")
+    crawl_cmd.add_argument('--parse-processes', type=int, default=0, help="解析进程数")
+    crawl_cmd.add_argument('--max-rate', type=float, default=1000.0, help="每秒最多请求数")
+    crawl_cmd.add_argument('--keep', action='store_true', help="保留输出目录")
+    crawl_cmd.set_defaults(func=bench_crawl)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()